@@ -2,112 +2,415 @@ import streamlit as st
 from streamlit_chat import message
 from dotenv import load_dotenv
 import os
-from openai import OpenAI
+import asyncio
+import hashlib
+import io
+import threading
+import uuid
+from functools import partial, singledispatch
+import httpx
+from openai import OpenAI, AsyncOpenAI
 
-from langchain.schema import SystemMessage, HumanMessage, AIMessage
-from langchain_experimental.tools import PythonREPLTool
-from langchain.agents import initialize_agent, AgentType
-from langchain_openai import ChatOpenAI
+from langchain.schema import BaseMessage, SystemMessage, HumanMessage, AIMessage
 from utils.doc import (
-    get_pdf_text,
-    get_text_chunks,
+    iter_pdf_texts,
+    iter_text_chunks,
     build_vector_store,
     load_vector_store,
     get_context_from_docs,
     get_documents_hash
 )
 from utils.git_repo import GitCodeEmbedder
-from utils.github_agent import get_github_modifier_agent
+from utils.batch_queue import BatchQueue
+from utils.semantic_cache import SemanticCache
+from utils.web_cache import cached
+from utils.github_agent import get_github_modifier_agent, release_agents
 from utils.github_validator import validate_github_setup, list_accessible_repositories
-from utils.voice import listen, speak, stop_speaking 
-import speech_recognition as sr
+from utils.voice import SR_AVAILABLE, get_microphone, warm_up_voice, listen, speak, start_speech_stream, stop_speaking, is_speaking, check_tts_status
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
+import ast
+import math
+import operator
+from collections import deque
+from itertools import chain
+from typing import Final
 
-recognizer = sr.Recognizer()
-def init():
+# Precompiled patterns and tables for the tool hot paths
+_WS_RE = re.compile(r'\s+')
+_DIGITS_RE = re.compile(r'\d+')
+# Phrases that mark a listen() result as an error message rather than speech
+_VOICE_ERROR_RE = re.compile(
+    r'sorry|mic error|no speech detected|speech recognition service error',
+    re.IGNORECASE
+)
+# An agent response containing one of these cues is waiting for confirmation
+_CONFIRM_CUE_RE = re.compile(r'will proceed|going to|about to|confirm|proceed', re.IGNORECASE)
+_YES_TOKENS: Final[frozenset] = frozenset({'yes', 'confirm', 'proceed', 'ok', 'sure', 'do it'})
+
+# Operators supported by the calculator's AST evaluator
+_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+_MAX_EXPONENT = 1000
+# Largest power result, in bits, so chained exponents cannot build huge integers
+_MAX_POW_BITS = 10_000
+
+
+def _eval_node(node):
+    """Evaluate an arithmetic AST node, rejecting anything that is not a number or operator"""
+    if isinstance(node, ast.Expression):
+        return _eval_node(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPS:
+        left, right = _eval_node(node.left), _eval_node(node.right)
+        if isinstance(node.op, ast.Pow):
+            if abs(right) > _MAX_EXPONENT:
+                raise ValueError(f"Exponent too large (max {_MAX_EXPONENT})")
+            if abs(left) > 1 and abs(right) * math.log2(abs(left)) > _MAX_POW_BITS:
+                raise ValueError(f"Result too large (max {_MAX_POW_BITS} bits)")
+        return _OPS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPS:
+        return _OPS[type(node.op)](_eval_node(node.operand))
+    raise ValueError(f"Unsupported expression: {type(node).__name__}")
+
+# Custom CSS for enhanced styling, built once at import
+_CSS: Final[str] = """
+<style>
+.main-header {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    padding: 1rem;
+    border-radius: 10px;
+    color: white;
+    text-align: center;
+    margin-bottom: 2rem;
+}
+
+.agent-card {
+    background: #f8f9fa;
+    padding: 1rem;
+    border-radius: 8px;
+    border-left: 4px solid #007bff;
+    margin: 1rem 0;
+}
+
+.feature-list {
+    background: #e9ecef;
+    padding: 1rem;
+    border-radius: 8px;
+    margin: 1rem 0;
+}
+
+.warning-box {
+    background: #fff3cd;
+    border: 1px solid #ffeaa7;
+    border-radius: 8px;
+    padding: 1rem;
+    margin: 1rem 0;
+}
+
+.success-box {
+    background: #d4edda;
+    border: 1px solid #c3e6cb;
+    border-radius: 8px;
+    padding: 1rem;
+    margin: 1rem 0;
+}
+
+.stButton > button {
+    border-radius: 20px;
+    font-weight: bold;
+}
+
+.stSelectbox > div > div > div {
+    border-radius: 10px;
+}
+
+.stTextInput > div > div > input {
+    border-radius: 10px;
+}
+</style>
+"""
+
+_PAGE_CONFIG: Final[dict] = {
+    "page_title": "ASK LLAMA - AI-Powered Multi-Agent Chatbot",
+    "layout": "wide",
+    "initial_sidebar_state": "expanded",
+    "menu_items": {
+        'Get Help': 'https://github.com/your-repo/ask-llama',
+        'Report a bug': 'https://github.com/your-repo/ask-llama/issues',
+        'About': 'ASK LLAMA is an AI-powered multi-agent chatbot for document analysis, GitHub repository management, and code generation.'
+    }
+}
+
+# Static About tab content, rendered in a single markdown element
+_ABOUT_MD: Final[str] = """
+### ℹ️ About ASK LLAMA
+
+**ASK LLAMA** is an AI-powered multi-agent chatbot that provides specialized assistance for different tasks.
+
+---
+
+#### 💬 General Chat
+
+**Purpose**: Engage in general conversation and get help with various topics
+
+**Capabilities**:
+- 💬 General conversation and Q&A
+- 📚 Answer questions on various topics
+- 🎯 Provide helpful information and advice
+- 🔄 Maintain conversation context
+- 🚀 No setup required - start chatting immediately
+
+**Best for**: General questions, casual conversation, getting help with various topics
+
+---
+
+#### 📄 Document Agent
+
+**Purpose**: Analyze and answer questions about PDF documents
+
+**Capabilities**:
+- 📖 Read and process PDF documents
+- 🔍 Search through document content
+- 💬 Answer questions based on document content
+- 🔗 Maintain context across multiple questions
+
+**Best for**: Research papers, reports, manuals, contracts, and any PDF-based content analysis
+
+---
+
+#### 📂 GitHub Repo Agent
+
+**Purpose**: Analyze and answer questions about GitHub repositories
+
+**Capabilities**:
+- 🔍 Explore repository structure
+- 📝 Read and analyze code files
+- 💡 Explain code functionality
+- 🔗 Understand code relationships
+- 📊 Provide insights about the codebase
+
+**Best for**: Code reviews, understanding unfamiliar codebases, documentation generation
+
+---
+
+#### ⚡ GitHub Code Modifier Agent
+
+**Purpose**: Create, edit, and manage files in GitHub repositories
+
+**Capabilities**:
+- ➕ Create new files and directories
+- ✏️ Edit existing files
+- 🗑️ Delete files
+- 🔍 Search and find files
+- 📋 List repository contents
+- 🌿 Manage branches
+- 📝 Generate code based on requirements
+
+**Best for**: Code generation, file management, repository maintenance, automated coding tasks
+
+⚠️ **Note**: This agent can make direct changes to your repository. Use with caution!
+
+---
+
+#### 🌐 Web Scraping Agent
+
+**Purpose**: Search and scrape web content using DuckDuckGo
+
+**Capabilities**:
+- 🔍 **Web Search**: Search the internet using DuckDuckGo
+- 📰 **News Search**: Find latest news articles on any topic
+- 🌐 **Website Scraping**: Extract content from specific websites
+- 📊 **Search & Scrape**: Search for content and scrape top results
+- 📝 **Content Analysis**: Analyze and summarize web content
+
+**Best for**: Research, news monitoring, data collection, content analysis, web research
+
+---
+
+#### 🧮 Calculator Agent
+
+**Purpose**: Perform mathematical calculations and data analysis
+
+**Capabilities**:
+- ➕ Simple arithmetic calculations
+- 🧮 Complex mathematical operations
+- 📊 Data analysis and statistics
+- 📈 Mathematical modeling
+- 🔢 Python code execution for advanced calculations
+
+**Best for**: Mathematical problems, data analysis, statistical calculations, scientific computations
+
+---
+
+#### 🔊 Voice Features
+
+- 🎙️ **Voice Input**: Speak your questions instead of typing
+- 🔊 **Voice Output**: Listen to AI responses aloud
+- 🎯 **Smart Processing**: Automatic text cleaning for better speech
+- ⏹️ **Control**: Stop speaking at any time
+
+---
+
+#### 🔑 API Configuration
+
+**Required**: Set one of the following environment variables:
+
+- **GITHUB_TOKEN**: For GitHub AI (recommended) - Set to your GitHub personal access token
+- **OPENAI_API_KEY**: For OpenAI - Set to your OpenAI API key
+
+The app will automatically use GitHub AI if GITHUB_TOKEN is available, otherwise fallback to OpenAI.
+
+---
+
+#### 💡 Tips for Best Results
+
+1. **Start Chatting**: You can begin chatting immediately without selecting an agent
+2. **Be Specific**: Provide clear, detailed instructions
+3. **Use Context**: All agents maintain conversation context - ask follow-up questions naturally
+4. **Voice Quality**: Speak clearly for better voice recognition
+5. **Repository Access**: Ensure your GitHub token has appropriate permissions
+6. **File Formats**: Use PDF files for Document Agent
+7. **API Keys**: Set GITHUB_TOKEN or OPENAI_API_KEY in your environment
+8. **Conversation Flow**: Each agent remembers previous interactions and can build on them
+
+---
+"""
+
+# Shown after a failed voice input attempt
+_VOICE_TIPS_MD: Final[str] = """
+- **Speak clearly and at a normal pace**
+- **Ensure your microphone is working and not muted**
+- **Try to minimize background noise**
+- **Wait for the "Listening... Speak now!" message before speaking**
+- **Speak a bit louder than normal conversation**
+- **Position yourself closer to the microphone**
+- **Try the "Test Voice Input" button first to verify microphone works**
+"""
+
+# Welcome banner shown until an agent is selected
+_WELCOME_HTML: Final[str] = """
+<div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 10px; color: white;">
+    <h3>🚀 Welcome to ASK LLAMA!</h3>
+    <p>You can start chatting right away, or select a specialized agent from the sidebar for enhanced capabilities.</p>
+    <p style="font-size: 0.9rem; opacity: 0.9;">Available agents: Document Agent, GitHub Repo Agent, GitHub Code Modifier Agent, Web Scraping Agent, or Calculator Agent</p>
+    <p style="font-size: 0.9rem; opacity: 0.9; margin-top: 1rem;">🎤 <strong>Voice Input & Output:</strong> Use voice for both input and output in all chat modes!</p>
+</div>
+"""
+
+# Scraped page text is truncated to this many characters
+_SCRAPE_MAX_CHARS = 3000
+_SCRAPE_BUFFER_CHARS = 2 * _SCRAPE_MAX_CHARS
+
+# Browser-like headers and a pooled keep-alive session shared by the scraping tools
+_DEFAULT_HEADERS: Final[dict] = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+_SESSION = requests.Session()
+_SESSION.headers.update(_DEFAULT_HEADERS)
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+)
+_SESSION.mount('https://', _ADAPTER)
+_SESSION.mount('http://', _ADAPTER)
+
+
+@st.cache_resource(show_spinner=False)
+def load_env():
+    """Load the .env file once per process instead of on every rerun"""
     load_dotenv()
+    return True
+
+
+@st.cache_resource(show_spinner=False)
+def _warmup():
+    """Import the heavy vector-store and embedding stacks once per process, off the UI thread"""
+    def load():
+        import chromadb
+        import sentence_transformers
+        import git
+
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+
+def init():
+    load_env()
+    st.set_page_config(**_PAGE_CONFIG)
+
     # Check for GitHub token (if using GitHub API)
-    if os.getenv("GITHUB_TOKEN") is None or os.getenv("GITHUB_TOKEN") == "":
+    if not os.getenv("GITHUB_TOKEN"):
         st.warning("GITHUB_TOKEN is not set in environment. Some features may be limited.")
+
+    # Elements do not persist across reruns, so the styles are emitted every
+    # time; only the string itself is built once
+    st.markdown(_CSS, unsafe_allow_html=True)
+    _warmup()
+
+    # Session defaults only need to be set on the first run
+    if st.session_state.get("session_initialized"):
+        return
+    st.session_state.session_initialized = True
     
-    st.set_page_config(
-        page_title="ASK LLAMA - AI-Powered Multi-Agent Chatbot",
-        layout="wide",
-        initial_sidebar_state="expanded",
-        menu_items={
-            'Get Help': 'https://github.com/your-repo/ask-llama',
-            'Report a bug': 'https://github.com/your-repo/ask-llama/issues',
-            'About': 'ASK LLAMA is an AI-powered multi-agent chatbot for document analysis, GitHub repository management, and code generation.'
-        }
-    )
     if "voice_input_enabled" not in st.session_state:
         st.session_state.voice_input_enabled = False
     if "voice_output_enabled" not in st.session_state:
         st.session_state.voice_output_enabled = True
-    if "is_speaking" not in st.session_state:
-        st.session_state.is_speaking = False
+    if "tts_future" not in st.session_state:
+        st.session_state.tts_future = None
     if "tts_working" not in st.session_state:
         st.session_state.tts_working = True
-    
-    # Custom CSS for enhanced styling
-    st.markdown("""
-    <style>
-    .main-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 1rem;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    
-    .agent-card {
-        background: #f8f9fa;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #007bff;
-        margin: 1rem 0;
-    }
-    
-    .feature-list {
-        background: #e9ecef;
-        padding: 1rem;
-        border-radius: 8px;
-        margin: 1rem 0;
-    }
-    
-    .warning-box {
-        background: #fff3cd;
-        border: 1px solid #ffeaa7;
-        border-radius: 8px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    
-    .success-box {
-        background: #d4edda;
-        border: 1px solid #c3e6cb;
-        border-radius: 8px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    
-    .stButton > button {
-        border-radius: 20px;
-        font-weight: bold;
-    }
-    
-    .stSelectbox > div > div > div {
-        border-radius: 10px;
-    }
-    
-    .stTextInput > div > div > input {
-        border-radius: 10px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+
+# Connection limits shared by the sync and async OpenAI HTTP/2 clients
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+
+
+@st.cache_resource(show_spinner=False)
+def get_openai_client(base_url, api_key):
+    """
+    OpenAI client over a pooled HTTP/2 connection, shared across reruns
+
+    Reusing the client keeps TLS sessions and keep-alive connections instead
+    of rebuilding them on every Streamlit rerun.
+    """
+    transport = httpx.HTTPTransport(http2=True, retries=2, limits=_HTTP_LIMITS)
+    http_client = httpx.Client(transport=transport)
+    return OpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+
+
+def create_async_openai_client(base_url, api_key):
+    """AsyncOpenAI client over a pooled HTTP/2 connection"""
+    transport = httpx.AsyncHTTPTransport(http2=True, retries=2, limits=_HTTP_LIMITS)
+    http_client = httpx.AsyncClient(transport=transport)
+    return AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_repo_validation(repo_url):
+    """Validate GitHub access for a repository, reusing the result for 60 seconds"""
+    return validate_github_setup(repo_url=repo_url)
+
 
 def create_custom_client():
     # Try GitHub AI first
@@ -119,7 +422,7 @@ def create_custom_client():
         model_name = "openai/gpt-4.1-mini"
         
         try:
-            client = OpenAI(base_url=endpoint, api_key=github_token)
+            client = get_openai_client(endpoint, github_token)
             return client, model_name
         except Exception as e:
             st.warning(f"GitHub AI client failed: {str(e)}. Trying OpenAI...")
@@ -128,7 +431,7 @@ def create_custom_client():
     if openai_key:
         model_name = "gpt-4.1-mini"
         try:
-            client = OpenAI(api_key=openai_key)
+            client = get_openai_client(None, openai_key)
             return client, model_name
         except Exception as e:
             st.error(f"Error creating OpenAI client: {str(e)}")
@@ -140,9 +443,17 @@ def create_custom_client():
 
 def create_web_scraping_tools():
     """Create tools for web scraping functionality using DuckDuckGo"""
+    # Heavy scraping dependencies are only loaded once this agent is used
     from langchain.tools import Tool
     from duckduckgo_search import DDGS
+    from selectolax.parser import HTMLParser
     
+    def is_tool_success(result: str) -> bool:
+        """Only cache real results, not error messages"""
+        return not result.startswith("Error")
+    
+    # Search results are cached for 10 minutes, scraped pages for 1 hour
+    @cached(ttl=600, cache_if=is_tool_success)
     def search_duckduckgo(query: str, max_results: int = 5) -> str:
         """Search the web using DuckDuckGo"""
         try:
@@ -161,100 +472,114 @@ def create_web_scraping_tools():
         except Exception as e:
             return f"Error searching for '{query}': {str(e)}"
     
+    def extract_page_text(content, url: str) -> str:
+        """Extract readable text from a downloaded page"""
+        tree = HTMLParser(content)
+        
+        # Remove script and style elements
+        for tag in ("script", "style", "nav", "footer"):
+            for node in tree.css(tag):
+                node.decompose()
+        
+        # Special handling for Hacker News
+        if "news.ycombinator.com" in url:
+            return scrape_hacker_news(tree, url)
+        
+        # Stream text nodes into a bounded buffer instead of building the whole page text
+        buf = io.StringIO()
+        root = tree.body or tree.root
+        if root:
+            for node in root.traverse(include_text=True):
+                if node.tag != "-text":
+                    continue
+                buf.write(node.text(deep=False))
+                buf.write(' ')
+                # Leave headroom for whitespace that gets collapsed below
+                if buf.tell() > _SCRAPE_BUFFER_CHARS:
+                    break
+        
+        # Remove excessive whitespace
+        text = _WS_RE.sub(' ', buf.getvalue()).strip()
+        
+        return f"Content from {url}:\n\n{text[:_SCRAPE_MAX_CHARS]}..." if len(text) > _SCRAPE_MAX_CHARS else f"Content from {url}:\n\n{text}"
+    
+    @cached(ttl=3600, cache_if=is_tool_success)
     def scrape_website(url: str) -> str:
         """Scrape content from a website"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-            response = requests.get(url, headers=headers, timeout=15)
+            response = _SESSION.get(url, timeout=15)
             response.raise_for_status()
+            return extract_page_text(response.content, url)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer"]):
-                script.decompose()
-            
-            # Special handling for Hacker News
-            if "news.ycombinator.com" in url:
-                return scrape_hacker_news(soup, url)
-            
-            # Get text content
-            text = soup.get_text()
-            
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            # Remove excessive whitespace
-            text = re.sub(r'\s+', ' ', text).strip()
-            
-            return f"Content from {url}:\n\n{text[:3000]}..." if len(text) > 3000 else f"Content from {url}:\n\n{text}"
+        except Exception as e:
+            return f"Error scraping {url}: {str(e)}"
+    
+    async def scrape_website_async(client, url: str) -> str:
+        """Scrape content from a website using a shared httpx client"""
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+            return extract_page_text(response.content, url)
             
         except Exception as e:
             return f"Error scraping {url}: {str(e)}"
     
-    def scrape_hacker_news(soup, url: str) -> str:
+    async def scrape_websites_async(urls):
+        """Fetch all URLs concurrently so total time is ~the slowest page"""
+        async with httpx.AsyncClient(
+            http2=True,
+            headers=_DEFAULT_HEADERS,
+            timeout=15,
+            follow_redirects=True,
+            limits=_HTTP_LIMITS
+        ) as client:
+            return await asyncio.gather(
+                *[scrape_website_async(client, url) for url in urls],
+                return_exceptions=True
+            )
+    
+    def scrape_hacker_news(tree, url: str) -> str:
         """Specialized scraper for Hacker News"""
         try:
-            # Find all story rows
-            stories = []
-            story_rows = soup.find_all('tr', class_='athing')
+            # Story rows and the subtext rows that follow them, each in one selector pass
+            story_rows = tree.css('tr.athing')[:20]  # Limit to top 20 stories
+            subtexts = tree.css('tr.athing + tr td.subtext')[:20]
             
-            for i, row in enumerate(story_rows[:20]):  # Limit to top 20 stories
+            stories = []
+            for i, (row, subtext) in enumerate(zip(story_rows, subtexts)):
                 try:
                     # Get title and link
-                    title_cell = row.find('td', class_='title')
-                    if title_cell:
-                        title_link = title_cell.find('a')
-                        if title_link:
-                            title = title_link.get_text().strip()
-                            link = title_link.get('href', '')
-                            if not link.startswith('http'):
-                                link = f"https://news.ycombinator.com{link}"
-                            
-                            # Get points and author from next row
-                            next_row = row.find_next_sibling('tr')
-                            points = "0"
-                            author = "Unknown"
-                            comments = "0"
-                            
-                            if next_row:
-                                subtext = next_row.find('td', class_='subtext')
-                                if subtext:
-                                    # Extract points
-                                    points_elem = subtext.find('span', class_='score')
-                                    if points_elem:
-                                        points = points_elem.get_text().replace(' points', '').replace(' point', '')
-                                    
-                                    # Extract author
-                                    author_elem = subtext.find('a', class_='hnuser')
-                                    if author_elem:
-                                        author = author_elem.get_text()
-                                    
-                                    # Extract comments
-                                    comments_elem = subtext.find_all('a')[-1]
-                                    if comments_elem and 'comment' in comments_elem.get_text().lower():
-                                        comments_text = comments_elem.get_text()
-                                        comments = re.search(r'\d+', comments_text)
-                                        if comments:
-                                            comments = comments.group()
-                            
-                            stories.append({
-                                'rank': i + 1,
-                                'title': title,
-                                'link': link,
-                                'points': points,
-                                'author': author,
-                                'comments': comments
-                            })
+                    title_link = row.css_first('td.title a')
+                    if not title_link:
+                        continue
+                    title = title_link.text().strip()
+                    link = title_link.attributes.get('href') or ''
+                    if not link.startswith('http'):
+                        link = f"https://news.ycombinator.com{link}"
+                    
+                    # Get points, author and comments from the subtext row
+                    points_elem = subtext.css_first('span.score')
+                    points = points_elem.text().replace(' points', '').replace(' point', '') if points_elem else "0"
+                    
+                    author_elem = subtext.css_first('a.hnuser')
+                    author = author_elem.text() if author_elem else "Unknown"
+                    
+                    comments = "0"
+                    links = subtext.css('a')
+                    comments_text = links[-1].text() if links else ""
+                    if 'comment' in comments_text.lower():
+                        match = _DIGITS_RE.search(comments_text)
+                        if match:
+                            comments = match.group()
+                    
+                    stories.append({
+                        'rank': i + 1,
+                        'title': title,
+                        'link': link,
+                        'points': points,
+                        'author': author,
+                        'comments': comments
+                    })
                 except Exception as e:
                     continue
             
@@ -280,20 +605,22 @@ def create_web_scraping_tools():
                 if not results:
                     return f"No results found for '{query}'"
                 
+                # Scrape the content from all result URLs at once
+                pages = asyncio.run(scrape_websites_async([result['link'] for result in results]))
+                
                 scraped_content = []
-                for i, result in enumerate(results, 1):
-                    try:
-                        # Scrape the content from the result URL
-                        content = scrape_website(result['link'])
+                for i, (result, content) in enumerate(zip(results, pages), 1):
+                    if isinstance(content, Exception):
+                        scraped_content.append(f"Result {i}: {result['title']}\nError scraping: {str(content)}\n")
+                    else:
                         scraped_content.append(f"Result {i}: {result['title']}\n{content}\n")
-                    except Exception as e:
-                        scraped_content.append(f"Result {i}: {result['title']}\nError scraping: {str(e)}\n")
                 
                 return f"Search and scrape results for '{query}':\n\n" + '\n'.join(scraped_content)
                 
         except Exception as e:
             return f"Error searching and scraping for '{query}': {str(e)}"
     
+    @cached(ttl=600, cache_if=is_tool_success)
     def search_news(query: str, max_results: int = 5) -> str:
         """Search for news articles using DuckDuckGo"""
         try:
@@ -340,6 +667,7 @@ def create_web_scraping_tools():
 def create_calculator_tools():
     """Create tools for calculator functionality"""
     from langchain.tools import Tool
+    from langchain_experimental.tools import PythonREPLTool
     
     # Python REPL tool for complex calculations
     python_repl = PythonREPLTool()
@@ -347,9 +675,8 @@ def create_calculator_tools():
     def simple_calculator(expression: str) -> str:
         """Perform simple mathematical calculations"""
         try:
-            # Remove any potentially dangerous characters
-            expression = re.sub(r'[^0-9+\-*/().\s]', '', expression)
-            result = eval(expression)
+            # Only numbers and arithmetic operators are evaluated, never arbitrary code
+            result = _eval_node(ast.parse(expression.strip(), mode='eval'))
             return f"Result: {result}"
         except Exception as e:
             return f"Error calculating {expression}: {str(e)}"
@@ -370,45 +697,307 @@ def create_calculator_tools():
     return tools
 
 
-def get_chat_response(client, model_name, messages):
+@singledispatch
+def render_response(response) -> str:
+    """Format an agent response for the chat history"""
+    return str(response)
+
+
+@render_response.register
+def _(response: str) -> str:
+    return response
+
+
+@render_response.register
+def _(response: BaseMessage) -> str:
+    return str(response.content)
+
+
+@render_response.register
+def _(response: dict) -> str:
+    # Commit results from the GitHub tools
+    if 'commit' not in response:
+        return str(response)
+    parts = [f"✅ Success! Commit: {response['commit']}\n\n"]
+    if 'message' in response:
+        parts.append(f"Commit message: {response['message']}\n\n")
+    content = response.get('content')
+    if hasattr(content, 'path'):
+        parts.append(f"File: {content.path}")
+    return "".join(parts)
+
+
+# OpenAI chat role for each LangChain message type
+_ROLE: Final[dict] = {SystemMessage: "system", HumanMessage: "user", AIMessage: "assistant"}
+
+
+def format_chat_messages(messages):
+    """Convert LangChain messages (any iterable) to the OpenAI chat format.
+
+    Returns a (formatted, error) tuple; error is a user-facing string when the
+    messages cannot be sent.
+    """
+    formatted = [
+        {"role": _ROLE.get(type(msg), "assistant"), "content": msg.content or ""}
+        for msg in messages
+    ]
+    
     # Validate messages
-    if not messages:
-        return "Sorry, I encountered an error: No messages provided."
+    if not formatted:
+        return None, "Sorry, I encountered an error: No messages provided."
     
-    formatted = []
-    for msg in messages:
-        role = (
-            "system" if isinstance(msg, SystemMessage)
-            else "user" if isinstance(msg, HumanMessage)
-            else "assistant"
-        )
-        # Ensure content is not empty
-        content = msg.content if msg.content else ""
-        if not content.strip() and role == "user":
-            return "Sorry, I encountered an error: No content in user message."
-        
-        formatted.append({"role": role, "content": content})
+    # Earlier turns were checked when they were sent, so only the newest needs it
+    last = formatted[-1]
+    if last["role"] == "user" and not last["content"].strip():
+        return None, "Sorry, I encountered an error: No content in user message."
+    
+    return formatted, None
+
 
+def stream_chat_response(client, model_name, messages, chunk_chars=32, cache_key=None):
+    """
+    Stream a chat completion as text chunks for st.write_stream
+
+    Deltas are buffered into chunks of at least `chunk_chars` characters so the
+    UI is not updated once per token. An error mid-stream is re-raised after
+    the buffered text is flushed, and nothing is cached for that turn.
+
+    `cache_key` is the user's own question. The semantic cache is only used
+    when it is given; a prompt built from a template and retrieved context
+    would embed as the context rather than the question.
+    """
+    formatted, error = format_chat_messages(messages)
+    if error:
+        yield error
+        return
+
+    cache = get_semantic_cache() if cache_key else None
+    if cache is not None:
+        namespace = get_cache_namespace(model_name, formatted)
+        cached = cache.lookup(cache_key, namespace=namespace)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    buffer = []
+    size = 0
     try:
-        response = client.chat.completions.create(
+        for delta in iter_response_deltas(client, model_name, formatted):
+            buffer.append(delta)
+            size += len(delta)
+            if size >= chunk_chars:
+                chunk = "".join(buffer)
+                parts.append(chunk)
+                yield chunk
+                buffer.clear()
+                size = 0
+    except Exception:
+        # Show what already arrived, then let the caller turn the failure into
+        # an error reply instead of storing a half answer
+        if buffer:
+            yield "".join(buffer)
+        raise
+
+    if buffer:
+        chunk = "".join(buffer)
+        parts.append(chunk)
+        yield chunk
+
+    response = "".join(parts)
+    if response and cache is not None:
+        cache.add(cache_key, response, namespace=namespace)
+
+
+def iter_response_deltas(client, model_name, formatted):
+    """
+    Yield the text deltas of a completion for an OpenAI-format conversation
+
+    On the OpenAI API the conversation is chained server-side with
+    previous_response_id, so only the messages added since the last response
+    are sent. Endpoints without the Responses API get the whole history.
+    """
+    if client.base_url.host != "api.openai.com":
+        stream = client.chat.completions.create(
             model=model_name,
             messages=formatted,
-            temperature=0.3  # Lower temperature for more focused responses
+            temperature=0.3,
+            stream=True
         )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Sorry, I encountered an error: {str(e)}"
+        for event in stream:
+            if event.choices:
+                yield event.choices[0].delta.content or ""
+        return
+
+    # Reuse the stored chain only if the history still starts with what it holds;
+    # summarization, a cleared chat or an agent switch start a new one
+    request = {"model": model_name, "input": formatted, "temperature": 0.3, "store": True, "stream": True}
+    previous = st.session_state.get("response_chain")
+    if previous:
+        sent = previous["messages"]
+        if len(formatted) > len(sent) and formatted[:len(sent)] == sent:
+            request["previous_response_id"] = previous["id"]
+            request["input"] = formatted[len(sent):]
+
+    parts = []
+    for event in client.responses.create(**request):
+        if event.type == "response.output_text.delta":
+            parts.append(event.delta)
+            yield event.delta
+        elif event.type == "response.completed":
+            st.session_state.response_chain = {
+                "id": event.response.id,
+                "messages": [*formatted, {"role": "assistant", "content": "".join(parts)}]
+            }
+
+
+def stream_spoken_response(client, model_name, messages, cache_key=None):
+    """
+    Generate a chat response while speaking it sentence by sentence
+
+    Chunks from stream_chat_response are handed to the TTS worker as they
+    arrive, so audio starts after the first sentence instead of the full reply.
+    """
+    speech = start_speech_stream()
+    parts = []
+    try:
+        for chunk in stream_chat_response(client, model_name, messages, cache_key=cache_key):
+            parts.append(chunk)
+            if speech:
+                speech.put(chunk)
+    finally:
+        if speech:
+            speech.put(None)
+    return "".join(parts)
+
+
+def get_cache_namespace(model_name, formatted):
+    """
+    Scope cache entries to the model, system prompt and previous turn so that
+    follow-ups like "tell me more" only match within the same conversation state
+    """
+    system_prompt = formatted[0]["content"] if formatted[0]["role"] == "system" else ""
+    previous_turn = formatted[-2]["content"] if len(formatted) > 1 and formatted[-2]["role"] != "system" else ""
+    return hashlib.md5(f"{model_name}\0{system_prompt}\0{previous_turn}".encode()).hexdigest()
+
+
+# Minimum similarity for a Document Agent question to reuse an earlier answer
+DOC_CACHE_THRESHOLD = 0.92
+
+
+@st.cache_resource(show_spinner=False)
+def get_semantic_cache():
+    """Process-wide semantic cache for chat completions"""
+    return SemanticCache(threshold=0.9, ttl=3600)
+
+
+async def get_chat_responses_async(async_client, model_name, batch_of_message_lists):
+    """Run several chat completions concurrently on an AsyncOpenAI client"""
+    async def _one(messages):
+        formatted, error = format_chat_messages(messages)
+        if error:
+            return error
+        try:
+            response = await async_client.chat.completions.create(
+                model=model_name,
+                messages=formatted,
+                temperature=0.3
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            return f"Sorry, I encountered an error: {str(e)}"
+
+    return await asyncio.gather(*[_one(messages) for messages in batch_of_message_lists])
+
+
+@st.cache_resource(show_spinner=False)
+def get_batch_queue(base_url, api_key, model_name):
+    """Process-wide queue that micro-batches chat completions for one endpoint"""
+    async_client = create_async_openai_client(base_url, api_key)
+    return BatchQueue(
+        partial(get_chat_responses_async, async_client, model_name),
+        max_batch_size=8,
+        max_wait=0.05
+    )
+
+
+# Chat history sent to the model is bounded; the oldest turns are folded into a
+# summary message, while the on-screen transcript keeps every turn
+MAX_HISTORY_MESSAGES = 32
+SUMMARY_BATCH_SIZE = 8
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+# Turns kept as pre-formatted text in the GitHub Code Modifier Agent's prompt context
+GITHUB_CONTEXT_TURNS = 3
+
+
+def new_chat_history(system_prompt):
+    """Create a bounded chat history starting with the given system prompt"""
+    return deque([SystemMessage(content=system_prompt)], maxlen=MAX_HISTORY_MESSAGES)
+
+
+def reset_chat_history(system_prompt):
+    """Start a new conversation: a fresh model history and an empty transcript"""
+    st.session_state.messages = new_chat_history(system_prompt)
+    st.session_state.display_messages = []
+
+
+def add_chat_message(client, model_name, message):
+    """Append to the chat history, summarizing the oldest turns when it is full"""
+    messages = st.session_state.messages
+    if len(messages) >= MAX_HISTORY_MESSAGES:
+        summarize_oldest_turns(client, model_name, messages)
+    messages.append(message)
+    st.session_state.display_messages.append(message)
+
+
+def summarize_oldest_turns(client, model_name, messages):
+    """Replace the oldest turns with a single summary SystemMessage after the system prompt"""
+    system_prompt = messages.popleft()
+    previous_summary = ""
+    if messages and isinstance(messages[0], SystemMessage):
+        previous_summary = messages.popleft().content
+    dropped = [messages.popleft() for _ in range(min(SUMMARY_BATCH_SIZE, len(messages)))]
+
+    transcript = "\n".join(
+        f"{'User' if isinstance(msg, HumanMessage) else 'Assistant'}: {msg.content}"
+        for msg in dropped
+    )
+    # Sent straight to the model: summaries are private to this conversation,
+    # so they must never be served from or stored in the shared semantic cache
+    batch_queue = get_batch_queue(str(client.base_url), client.api_key, model_name)
+    try:
+        summary = batch_queue.submit([
+            SystemMessage(content="Summarize the conversation below in a few sentences. Keep any facts, names and results that later questions may refer to."),
+            HumanMessage(content=f"{previous_summary}\n\n{transcript}".strip())
+        ])
+    except Exception:
+        summary = None
+    if not summary or summary.startswith("Sorry, I encountered an error"):
+        # Keep the previous summary rather than storing the error
+        summary_message = previous_summary
+    else:
+        summary_message = f"{SUMMARY_PREFIX}{summary}"
+
+    if summary_message:
+        messages.appendleft(SystemMessage(content=summary_message))
+    messages.appendleft(system_prompt)
+
+
+def get_session_key():
+    """Stable id for this browser session, used to scope process-wide caches"""
+    if "session_key" not in st.session_state:
+        st.session_state.session_key = uuid.uuid4().hex
+    return st.session_state.session_key
 
 
 def clear_chat_history():
-    st.session_state.messages = [
-        SystemMessage(content="You are a helpful assistant. Please wait for the user to select an agent type.")
-    ]
+    reset_chat_history(
+        "You are a helpful assistant. Please wait for the user to select an agent type."
+    )
     st.session_state.vector_store = None
     st.session_state.git_embedder = None
-    # Clean up GitHub Code Modifier Agent
-    if "github_modifier" in st.session_state:
-        st.session_state.github_modifier.cleanup()
+    # Clean up this session's GitHub Code Modifier Agents
+    release_agents(get_session_key())
     st.session_state.github_modifier_agent = None
     st.session_state.github_modifier = None
     st.session_state.current_repo_url = None
@@ -420,15 +1009,303 @@ def clear_chat_history():
 
 
 def handle_voice_input():
-    recognizer = sr.Recognizer()
     try:
-        user_input = listen(recognizer)
+        user_input = listen()
         if user_input and not user_input.startswith("Sorry") and not user_input.startswith("Mic error"):
             return user_input
     except Exception as e:
         st.error(f"Voice input error: {e}")
     return None
 
+
+@st.cache_resource(show_spinner=False)
+def get_llm(model_name):
+    """ChatOpenAI shared by the LangChain agents, using the same key and base as the main client"""
+    from langchain_openai import ChatOpenAI
+    api_key = os.getenv("GITHUB_TOKEN") or os.getenv("OPENAI_API_KEY")
+    api_base = "https://models.github.ai/inference" if os.getenv("GITHUB_TOKEN") else None
+    
+    return ChatOpenAI(
+        model=model_name, 
+        temperature=0,
+        openai_api_key=api_key,
+        openai_api_base=api_base
+    )
+
+
+def build_tool_agent(create_tools, model_name):
+    """Zero-shot ReAct agent over the tools from `create_tools`, on the shared LLM"""
+    from langchain.agents import initialize_agent, AgentType
+    return initialize_agent(
+        create_tools(), 
+        get_llm(model_name), 
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=True,
+        handle_parsing_errors=True
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_tool_agent(create_tools, model_name):
+    """
+    Tool agent built once per process and shared by every session
+
+    Only for stateless tools; tools that keep state between calls, such as
+    the Python REPL, must be built per session with build_tool_agent.
+    """
+    return build_tool_agent(create_tools, model_name)
+
+
+# --- Agent handlers ---
+# Each handler gets the previous AI response (None if there is none) and returns
+# (response, model_input, context); a response of None means the chat model
+# should answer model_input
+
+def get_last_ai_response():
+    """Content of the newest message if it is an AI response, else None"""
+    messages = st.session_state.messages
+    return messages[-1].content if messages and isinstance(messages[-1], AIMessage) else None
+
+
+def run_default_chat(client, model_name, user_input, last_ai_response):
+    """Simple chat with conversation history when no agent is selected"""
+    # Simple chat loop with conversation history
+    try:
+        chat_history = chain(st.session_state.messages, (HumanMessage(content=user_input),))
+        response = st.write_stream(stream_chat_response(client, model_name, chat_history, cache_key=user_input))
+    except Exception as e:
+        response = f"Sorry, I encountered an error: {str(e)}"
+    return response, user_input, None
+
+
+def run_document_agent(client, model_name, user_input, last_ai_response):
+    """Answer from the uploaded documents, reusing the previous context for follow-ups"""
+    context = None
+    model_input = user_input
+    response = None
+    use_previous_context = bool(last_ai_response is not None and st.session_state.get("context"))
+    st.session_state.pop("doc_cache_key", None)
+    
+    if st.session_state.get("vector_store"):
+        if use_previous_context:
+            # Use previous context for follow-up questions
+            context = st.session_state.context
+            model_input = f"""This is a follow-up question about the same document context. 
+            Use the previous context to answer. If unclear, say you need more specific information.
+            
+            Previous Context:
+            {context}
+            
+            Follow-up Question: {user_input}"""
+        else:
+            # New question - get fresh context
+            context = get_context_from_docs(user_input, st.session_state.vector_store)
+            if context:
+                st.session_state.context = context  # Store for possible follow-ups
+                
+                # Rephrasings of a question already answered for these documents reuse that answer
+                files_hash = st.session_state.get("processed_files_hash")
+                if files_hash:
+                    namespace = f"doc:{files_hash}"
+                    cached = get_semantic_cache().lookup(user_input, namespace=namespace, threshold=DOC_CACHE_THRESHOLD)
+                    if cached is not None:
+                        return cached, model_input, context
+                    st.session_state.doc_cache_key = (user_input, namespace)
+                
+                model_input = f"""You are a document assistant. Use this context to answer. 
+                For follow-up questions, maintain context about these documents.
+                
+                Context:
+                {context}
+                
+                Question: {user_input}"""
+            else:
+                response = "I can only answer questions about the uploaded documents. Please ask something related to the documents."
+    else:
+        response = "Please upload documents first before asking questions."
+    return response, model_input, context
+
+
+def run_github_repo_agent(client, model_name, user_input, last_ai_response):
+    """Answer questions about the embedded GitHub repository"""
+    context = None
+    model_input = user_input
+    response = None
+    if st.session_state.get("git_embedder"):
+        # Check if this is a follow-up question
+        if last_ai_response is not None:
+            # Use previous context for follow-up questions
+            model_input = f"""This is a follow-up question about the same GitHub repository. 
+            Use the previous conversation context to answer. If unclear, say you need more specific information.
+            
+            Previous AI Response:
+            {last_ai_response}
+            
+            Follow-up Question: {user_input}
+            
+            Please maintain context from the previous conversation and respond appropriately."""
+        else:
+            # New question - get fresh context
+            context = st.session_state.git_embedder.get_context(user_input)
+            if context:
+                model_input = f"""You are a GitHub repository assistant. Use this code context to answer the question. 
+                For follow-up questions, maintain context about this codebase.
+                
+                Code Context:
+                {context}
+                
+                Question: {user_input}"""
+            else:
+                response = "I can only answer questions about the provided GitHub repository. Please ask something related to the codebase."
+    else:
+        response = "Please provide a GitHub repository URL and process it first before asking questions."
+    return response, model_input, context
+
+
+def run_github_modifier_agent(client, model_name, user_input, last_ai_response):
+    """Run the GitHub Code Modifier Agent, handling confirmations of pending actions"""
+    response = None
+    if st.session_state.get("github_modifier_agent"):
+        try:
+            # Initialize context if not exists
+            if 'github_agent_context' not in st.session_state:
+                st.session_state.github_agent_context = {
+                    'conversation_history': deque(maxlen=GITHUB_CONTEXT_TURNS),
+                    'last_action': None,
+                    'pending_action': None
+                }
+            agent_context = st.session_state.github_agent_context
+            
+            # Check if this is a follow-up to a previous action
+            if last_ai_response is not None:
+                # If the last response mentioned an action that needs confirmation
+                if _CONFIRM_CUE_RE.search(last_ai_response):
+                    # This is likely a confirmation response
+                    if user_input.strip().lower() in _YES_TOKENS:
+                        # Execute the pending action
+                        if 'pending_action' in st.session_state:
+                            action = st.session_state.pending_action
+                            with st.spinner(f"Executing {action['type']}..."):
+                                response = st.session_state.github_modifier_agent.run(action['command'])
+                            # Clear pending action
+                            del st.session_state.pending_action
+                            agent_context['last_action'] = action
+                        else:
+                            response = "I don't have a pending action to execute. Please specify what you'd like me to do."
+                    else:
+                        response = "Action cancelled. Please specify what you'd like me to do."
+                else:
+                    # Regular conversation - maintain context
+                    history_text = "\n".join(agent_context['conversation_history'])
+                    context_prompt = f"""Previous conversation context:
+                    Last AI response: {last_ai_response}
+                    Conversation history: {history_text}
+                    
+                    Current user input: {user_input}
+                    
+                    Please maintain context from the previous conversation and respond appropriately. If the user is confirming an action, execute it. If they're asking a follow-up question, use the context from the previous response."""
+                    
+                    with st.spinner("Processing with GitHub Code Modifier Agent..."):
+                        response = st.session_state.github_modifier_agent.run(context_prompt)
+            else:
+                # First message or new conversation
+                with st.spinner("Processing with GitHub Code Modifier Agent..."):
+                    response = st.session_state.github_modifier_agent.run(user_input)
+                    
+                # Check if the response indicates a pending action that needs confirmation
+                if _CONFIRM_CUE_RE.search(response):
+                    # Store the action for confirmation
+                    st.session_state.pending_action = {
+                        'type': 'file_operation',
+                        'command': user_input,
+                        'response': response
+                    }
+                    
+            # Update context with response
+            agent_context['conversation_history'].append(f"User: {user_input}\nAI: {response}")
+                    
+        except Exception as e:
+            error_msg = str(e)
+            st.error(f"Agent execution error: {error_msg}")
+            
+            # Provide specific guidance based on error type
+            if "404" in error_msg and "Not Found" in error_msg:
+                st.info("💡 This appears to be a file not found error. Please check the file path and ensure the file exists in the repository.")
+            elif "'list' object has no attribute 'lower'" in error_msg:
+                st.info("💡 This is an internal parsing error. Please try rephrasing your request.")
+            elif "'dict' object has no attribute 'lower'" in error_msg:
+                st.info("💡 This is an internal parsing error. Please try rephrasing your request or restart the agent.")
+            elif "Authentication failed" in error_msg:
+                st.info("💡 Please check your GitHub token permissions and ensure it has access to the repository.")
+            else:
+                st.info("💡 This might be due to network issues, model access problems, or repository permissions.")
+            
+            response = f"❌ Error using GitHub Code Modifier Agent: {error_msg}"
+    else:
+        response = "Please initialize the GitHub Code Modifier Agent first by providing a repository URL and clicking 'Initialize Code Modifier Agent'."
+    return response, user_input, None
+
+
+def run_web_scraping_agent(client, model_name, user_input, last_ai_response):
+    """Run the Web Scraping Agent, initializing it on first use"""
+    if "web_scraping_agent" not in st.session_state:
+        # Initialize web scraping agent
+        st.session_state.web_scraping_agent = get_tool_agent(create_web_scraping_tools, model_name)
+    
+    # Check if this is a follow-up question
+    if last_ai_response is not None:
+        # Add context to the user input for follow-up questions
+        contextualized_input = f"""Previous response: {last_ai_response}
+
+Follow-up question: {user_input}
+
+Please maintain context from the previous web scraping results and respond appropriately. If the user is asking for more details about previously scraped content, refer to that context."""
+    else:
+        contextualized_input = user_input
+    
+    with st.spinner("Processing with Web Scraping Agent..."):
+        try:
+            response = st.session_state.web_scraping_agent.run(contextualized_input)
+        except Exception as e:
+            response = f"❌ Error using Web Scraping Agent: {str(e)}"
+    return response, user_input, None
+
+
+def run_calculator_agent(client, model_name, user_input, last_ai_response):
+    """Run the Calculator Agent, initializing it on first use"""
+    if "calculator_agent" not in st.session_state:
+        # Built per session: the Python REPL keeps its globals between runs
+        st.session_state.calculator_agent = build_tool_agent(create_calculator_tools, model_name)
+    
+    # Check if this is a follow-up question
+    if last_ai_response is not None:
+        # Add context to the user input for follow-up questions
+        contextualized_input = f"""Previous calculation result: {last_ai_response}
+
+Follow-up request: {user_input}
+
+Please maintain context from the previous calculation and respond appropriately. If the user is asking for calculations based on previous results, use those values."""
+    else:
+        contextualized_input = user_input
+    
+    with st.spinner("Processing with Calculator Agent..."):
+        try:
+            response = st.session_state.calculator_agent.run(contextualized_input)
+        except Exception as e:
+            response = f"❌ Error using Calculator Agent: {str(e)}"
+    return response, user_input, None
+
+
+# Agent type -> handler; anything else (no agent selected) uses run_default_chat
+AGENT_DISPATCH: Final[dict] = {
+    "Document Agent": run_document_agent,
+    "GitHub Repo Agent": run_github_repo_agent,
+    "GitHub Code Modifier Agent": run_github_modifier_agent,
+    "Web Scraping Agent": run_web_scraping_agent,
+    "Calculator Agent": run_calculator_agent,
+}
+
+
 def main():
     init()
     client, model_name = create_custom_client()
@@ -489,34 +1366,34 @@ def main():
             if new_agent_type != st.session_state.agent_type:
                 st.session_state.agent_type = new_agent_type
                 if new_agent_type == "Select Agent":
-                    st.session_state.messages = [
-                        SystemMessage(content="You are ASK LLAMA, a helpful AI assistant. You can engage in general conversation, answer questions, and provide assistance. When users select a specialized agent, you'll switch to that specific role. Always maintain context from previous conversations and be helpful and informative.")
-                    ]
+                    reset_chat_history(
+                        "You are ASK LLAMA, a helpful AI assistant. You can engage in general conversation, answer questions, and provide assistance. When users select a specialized agent, you'll switch to that specific role. Always maintain context from previous conversations and be helpful and informative."
+                    )
                     st.session_state.agent = None
                 elif new_agent_type == "Document Agent":
-                    st.session_state.messages = [
-                        SystemMessage(content="You are a document assistant. Only answer questions based on the provided documents. If a question is unrelated to the documents, politely decline to answer.")
-                    ]
+                    reset_chat_history(
+                        "You are a document assistant. Only answer questions based on the provided documents. If a question is unrelated to the documents, politely decline to answer."
+                    )
                     st.session_state.agent = None
                 elif new_agent_type == "GitHub Code Modifier Agent":
-                    st.session_state.messages = [
-                        SystemMessage(content="You are a GitHub Code Modifier Agent. You can list files, read contents, make edits, and commit changes to GitHub repositories. Be careful and precise with all operations.")
-                    ]
+                    reset_chat_history(
+                        "You are a GitHub Code Modifier Agent. You can list files, read contents, make edits, and commit changes to GitHub repositories. Be careful and precise with all operations."
+                    )
                     st.session_state.agent = None
                 elif new_agent_type == "Web Scraping Agent":
-                    st.session_state.messages = [
-                        SystemMessage(content="You are a web scraping assistant powered by DuckDuckGo. You can search the web, find news articles, scrape website content, and provide insights from web data. Always maintain context from previous conversations and refer to previously scraped content when answering follow-up questions. Use the appropriate tools for web search and scraping tasks.")
-                    ]
+                    reset_chat_history(
+                        "You are a web scraping assistant powered by DuckDuckGo. You can search the web, find news articles, scrape website content, and provide insights from web data. Always maintain context from previous conversations and refer to previously scraped content when answering follow-up questions. Use the appropriate tools for web search and scraping tasks."
+                    )
                     st.session_state.agent = None
                 elif new_agent_type == "Calculator Agent":
-                    st.session_state.messages = [
-                        SystemMessage(content="You are a calculator assistant. You can perform mathematical calculations, solve equations, and provide numerical analysis. Always maintain context from previous calculations and use previous results when answering follow-up questions. Use Python REPL for complex calculations.")
-                    ]
+                    reset_chat_history(
+                        "You are a calculator assistant. You can perform mathematical calculations, solve equations, and provide numerical analysis. Always maintain context from previous calculations and use previous results when answering follow-up questions. Use Python REPL for complex calculations."
+                    )
                     st.session_state.agent = None
                 else:
-                    st.session_state.messages = [
-                        SystemMessage(content="You are a GitHub repository assistant. Only answer questions about the provided codebase. Always maintain context from previous conversations and refer to previously discussed code when answering follow-up questions. If a question is unrelated to the repository, politely decline to answer.")
-                    ]
+                    reset_chat_history(
+                        "You are a GitHub repository assistant. Only answer questions about the provided codebase. Always maintain context from previous conversations and refer to previously discussed code when answering follow-up questions. If a question is unrelated to the repository, politely decline to answer."
+                    )
                     st.session_state.agent = None
                 st.rerun()
 
@@ -534,17 +1411,19 @@ def main():
                 )
                 
                 # Check if we have new documents to process
+                files_hash = get_documents_hash(uploaded_files) if uploaded_files else None
                 if uploaded_files and (
                     "processed_files_hash" not in st.session_state or
-                    st.session_state.processed_files_hash != get_documents_hash(uploaded_files)
+                    st.session_state.processed_files_hash != files_hash
                 ):
                     with st.spinner("Reading and indexing PDFs..."):
                         try:
                             # Store hash of processed files
-                            st.session_state.processed_files_hash = get_documents_hash(uploaded_files)
+                            st.session_state.processed_files_hash = files_hash
                             
-                            raw_text = get_pdf_text(uploaded_files)
-                            chunks = get_text_chunks(raw_text)
+                            # Parse PDFs in parallel and chunk each one as it finishes
+                            texts = iter_pdf_texts(uploaded_files)
+                            chunks = iter_text_chunks(texts)
                             st.session_state.vector_store = build_vector_store(chunks)
                             st.success("PDFs processed successfully!")
                         except Exception as e:
@@ -587,7 +1466,7 @@ def main():
                     with st.spinner("Setting up GitHub Code Modifier Agent..."):
                         try:
                             # First validate repository access
-                            validation = validate_github_setup(repo_url=repo_url)
+                            validation = get_repo_validation(repo_url)
                             if not validation.get("repo_accessible", False):
                                 st.error(f"❌ Repository access failed: {validation.get('error', 'Unknown error')}")
                                 if validation.get("suggestions"):
@@ -603,7 +1482,7 @@ def main():
                             
                             # Initialize the agent
                             try:
-                                agent, modifier = get_github_modifier_agent(repo_url)
+                                agent, modifier = get_github_modifier_agent(repo_url, session_key=get_session_key())
                                 st.session_state.github_modifier_agent = agent
                                 st.session_state.github_modifier = modifier
                                 st.session_state.current_repo_url = repo_url
@@ -618,8 +1497,7 @@ def main():
                 
                 if st.session_state.get("github_modifier_agent"):
                     if st.button("Reset Agent"):
-                        if "github_modifier" in st.session_state:
-                            st.session_state.github_modifier.cleanup()
+                        release_agents(get_session_key())
                         st.session_state.github_modifier_agent = None
                         st.session_state.github_modifier = None
                         st.session_state.current_repo_url = None
@@ -676,30 +1554,30 @@ def main():
             st.subheader("🎙️ Voice Input Test")
             
             # Microphone status check
-            try:
-                import speech_recognition as sr
-                mic = sr.Microphone()
-                st.success("✅ Microphone detected and available")
-            except Exception as e:
-                st.error(f"❌ Microphone issue: {str(e)}")
-                st.info("💡 Please check your microphone permissions and settings")
+            if not SR_AVAILABLE:
+                st.error("❌ Microphone issue: the speech_recognition package is not installed")
+            else:
+                try:
+                    get_microphone()
+                    # Voice input is usable, so start loading the offline model now
+                    warm_up_voice()
+                    st.success("✅ Microphone detected and available")
+                except Exception as e:
+                    st.error(f"❌ Microphone issue: {str(e)}")
+                    st.info("💡 Please check your microphone permissions and settings")
             if st.button("🎤 Test Voice Input", use_container_width=True,
                         help="Test voice input functionality"):
-                if 'recognizer' not in st.session_state:
-                    st.session_state.recognizer = sr.Recognizer()
-                
                 with st.spinner("🎙️ Testing voice input..."):
-                    test_input = listen(st.session_state.recognizer)
-                    if test_input and not any(error_phrase in test_input.lower() for error_phrase in [
-                        "sorry", "mic error", "no speech detected", "speech recognition service error", "timeout"
-                    ]):
+                    test_input = listen()
+                    if test_input and not _VOICE_ERROR_RE.search(test_input):
                         st.success(f"✅ Voice input test successful! Captured: '{test_input}'")
                     else:
                         st.error(f"❌ Voice input test failed: {test_input}")
                         st.info("💡 Try speaking louder or checking your microphone settings")
 
-            # Show speaking status
-            if st.session_state.is_speaking:
+            # Show speaking status from the background TTS future
+            check_tts_status()
+            if is_speaking():
                 st.warning("🔊 Currently speaking...")
             
             st.markdown("---")
@@ -709,36 +1587,32 @@ def main():
             st.info("Click the button below to speak your question instead of typing")
             
             if st.button("🎙️ Speak Your Question", use_container_width=True):
-                # Initialize recognizer if not already done
-                if 'recognizer' not in st.session_state:
-                    st.session_state.recognizer = sr.Recognizer()
-                
                 with st.spinner("🎙️ Listening for your voice input..."):
-                    user_input = listen(st.session_state.recognizer)
+                    user_input = listen()
                     # Debug: Show what was captured
                     if user_input:
                         st.info(f"🎤 Captured: '{user_input}'")
                 
                 # Check if voice input was successful
-                if user_input and user_input.strip() and not any(error_phrase in user_input.lower() for error_phrase in [
-                    "sorry", "mic error", "no speech detected", "speech recognition service error"
-                ]):
+                if user_input and user_input.strip() and not _VOICE_ERROR_RE.search(user_input):
                     # Set flag to hide welcome message immediately
                     st.session_state.user_started_typing = True
                     
                     # adds user's prompt to session state
-                    st.session_state.messages.append(HumanMessage(content=user_input))
+                    add_chat_message(client, model_name, HumanMessage(content=user_input))
 
                     with st.spinner('Generating response...'):
                         # Get response based on agent type
                         agent_type = st.session_state.agent_type
                         response = None
+                        spoken = False
                         
                         if not agent_type or agent_type == "Select Agent":
                             # General chat
                             try:
-                                chat_history = st.session_state.messages + [HumanMessage(content=user_input)]
-                                response = get_chat_response(client, model_name, chat_history)
+                                # The user's message was already added to the history above
+                                response = stream_spoken_response(client, model_name, st.session_state.messages, cache_key=user_input)
+                                spoken = True
                             except Exception as e:
                                 response = f"Sorry, I encountered an error: {str(e)}"
                         elif agent_type == "GitHub Code Modifier Agent":
@@ -768,18 +1642,17 @@ def main():
                         else:
                             # For Document Agent and GitHub Repo Agent, use general chat
                             try:
-                                chat_history = st.session_state.messages + [HumanMessage(content=user_input)]
-                                response = get_chat_response(client, model_name, chat_history)
+                                # The user's message was already added to the history above
+                                response = stream_spoken_response(client, model_name, st.session_state.messages, cache_key=user_input)
+                                spoken = True
                             except Exception as e:
                                 response = f"Sorry, I encountered an error: {str(e)}"
 
                         # appends response to the message list
-                        st.session_state.messages.append(AIMessage(content=response))
+                        add_chat_message(client, model_name, AIMessage(content=response))
                     
-                    st.session_state.needs_save = True  # Mark that we need to save
-                    
-                    # Speak the response if voice output is enabled
-                    if st.session_state.voice_output_enabled and st.session_state.tts_working:
+                    # Speak the response if voice output is enabled (streamed replies already are)
+                    if not spoken and st.session_state.voice_output_enabled and st.session_state.tts_working:
                         speak(response)
                     
                     st.rerun()
@@ -787,477 +1660,55 @@ def main():
                     # Show the specific error message from voice input
                     st.error(f"Voice input failed: {user_input}")
                     st.info("💡 Tips for better voice input:")
-                    st.markdown("""
-                    - **Speak clearly and at a normal pace**
-                    - **Ensure your microphone is working and not muted**
-                    - **Try to minimize background noise**
-                    - **Wait for the "Listening... Speak now!" message before speaking**
-                    - **Speak a bit louder than normal conversation**
-                    - **Position yourself closer to the microphone**
-                    - **Try the "Test Voice Input" button first to verify microphone works**
-                    """)
+                    st.markdown(_VOICE_TIPS_MD)
         
         # About Tab
         with sidebar_tab3:
-            st.markdown("### ℹ️ About ASK LLAMA")
-            st.markdown("""
-            **ASK LLAMA** is an AI-powered multi-agent chatbot that provides specialized assistance for different tasks.
-            """)
-            
-            st.markdown("---")
-            
-            # General Chat Info
-            st.markdown("#### 💬 General Chat")
-            st.markdown("""
-            **Purpose**: Engage in general conversation and get help with various topics
-            
-            **Capabilities**:
-            - 💬 General conversation and Q&A
-            - 📚 Answer questions on various topics
-            - 🎯 Provide helpful information and advice
-            - 🔄 Maintain conversation context
-            - 🚀 No setup required - start chatting immediately
-            
-            **Best for**: General questions, casual conversation, getting help with various topics
-            """)
-            
-            st.markdown("---")
-            
-            # Document Agent Info
-            st.markdown("#### 📄 Document Agent")
-            st.markdown("""
-            **Purpose**: Analyze and answer questions about PDF documents
-            
-            **Capabilities**:
-            - 📖 Read and process PDF documents
-            - 🔍 Search through document content
-            - 💬 Answer questions based on document content
-            - 🔗 Maintain context across multiple questions
-            
-            **Best for**: Research papers, reports, manuals, contracts, and any PDF-based content analysis
-            """)
-            
-            st.markdown("---")
-            
-            # GitHub Repo Agent Info
-            st.markdown("#### 📂 GitHub Repo Agent")
-            st.markdown("""
-            **Purpose**: Analyze and answer questions about GitHub repositories
-            
-            **Capabilities**:
-            - 🔍 Explore repository structure
-            - 📝 Read and analyze code files
-            - 💡 Explain code functionality
-            - 🔗 Understand code relationships
-            - 📊 Provide insights about the codebase
-            
-            **Best for**: Code reviews, understanding unfamiliar codebases, documentation generation
-            """)
-            
-            st.markdown("---")
-            
-            # GitHub Code Modifier Agent Info
-            st.markdown("#### ⚡ GitHub Code Modifier Agent")
-            st.markdown("""
-            **Purpose**: Create, edit, and manage files in GitHub repositories
-            
-            **Capabilities**:
-            - ➕ Create new files and directories
-            - ✏️ Edit existing files
-            - 🗑️ Delete files
-            - 🔍 Search and find files
-            - 📋 List repository contents
-            - 🌿 Manage branches
-            - 📝 Generate code based on requirements
-            
-            **Best for**: Code generation, file management, repository maintenance, automated coding tasks
-            
-            ⚠️ **Note**: This agent can make direct changes to your repository. Use with caution!
-            """)
-            
-            st.markdown("---")
-            
-            # Web Scraping Agent Info
-            st.markdown("#### 🌐 Web Scraping Agent")
-            st.markdown("""
-            **Purpose**: Search and scrape web content using DuckDuckGo
-            
-            **Capabilities**:
-            - 🔍 **Web Search**: Search the internet using DuckDuckGo
-            - 📰 **News Search**: Find latest news articles on any topic
-            - 🌐 **Website Scraping**: Extract content from specific websites
-            - 📊 **Search & Scrape**: Search for content and scrape top results
-            - 📝 **Content Analysis**: Analyze and summarize web content
-            
-            **Best for**: Research, news monitoring, data collection, content analysis, web research
-            """)
-            
-            st.markdown("---")
-            
-            # Calculator Agent Info
-            st.markdown("#### 🧮 Calculator Agent")
-            st.markdown("""
-            **Purpose**: Perform mathematical calculations and data analysis
-            
-            **Capabilities**:
-            - ➕ Simple arithmetic calculations
-            - 🧮 Complex mathematical operations
-            - 📊 Data analysis and statistics
-            - 📈 Mathematical modeling
-            - 🔢 Python code execution for advanced calculations
-            
-            **Best for**: Mathematical problems, data analysis, statistical calculations, scientific computations
-            """)
-            
-            st.markdown("---")
-            
-            # Voice Features
-            st.markdown("#### 🔊 Voice Features")
-            st.markdown("""
-            - 🎙️ **Voice Input**: Speak your questions instead of typing
-            - 🔊 **Voice Output**: Listen to AI responses aloud
-            - 🎯 **Smart Processing**: Automatic text cleaning for better speech
-            - ⏹️ **Control**: Stop speaking at any time
-            """)
-            
-            st.markdown("---")
-            
-            # API Configuration
-            st.markdown("#### 🔑 API Configuration")
-            st.markdown("""
-            **Required**: Set one of the following environment variables:
-            
-            - **GITHUB_TOKEN**: For GitHub AI (recommended) - Set to your GitHub personal access token
-            - **OPENAI_API_KEY**: For OpenAI - Set to your OpenAI API key
-            
-            The app will automatically use GitHub AI if GITHUB_TOKEN is available, otherwise fallback to OpenAI.
-            """)
-            
-            st.markdown("---")
-            
-            # Tips
-            st.markdown("#### 💡 Tips for Best Results")
-            st.markdown("""
-            1. **Start Chatting**: You can begin chatting immediately without selecting an agent
-            2. **Be Specific**: Provide clear, detailed instructions
-            3. **Use Context**: All agents maintain conversation context - ask follow-up questions naturally
-            4. **Voice Quality**: Speak clearly for better voice recognition
-            5. **Repository Access**: Ensure your GitHub token has appropriate permissions
-            6. **File Formats**: Use PDF files for Document Agent
-            7. **API Keys**: Set GITHUB_TOKEN or OPENAI_API_KEY in your environment
-            8. **Conversation Flow**: Each agent remembers previous interactions and can build on them
-            """)
-            
-            st.markdown("---")
+            st.markdown(_ABOUT_MD)
         
     # Enhanced main area styling
     
     
     # Display agent status with enhanced styling
     if not st.session_state.agent_type:
-        st.markdown("""
-        <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 10px; color: white;">
-            <h3>🚀 Welcome to ASK LLAMA!</h3>
-            <p>You can start chatting right away, or select a specialized agent from the sidebar for enhanced capabilities.</p>
-            <p style="font-size: 0.9rem; opacity: 0.9;">Available agents: Document Agent, GitHub Repo Agent, GitHub Code Modifier Agent, Web Scraping Agent, or Calculator Agent</p>
-            <p style="font-size: 0.9rem; opacity: 0.9; margin-top: 1rem;">🎤 <strong>Voice Input & Output:</strong> Use voice for both input and output in all chat modes!</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_WELCOME_HTML, unsafe_allow_html=True)
 
     # --- Chat Input ---
-    user_input = st.chat_input("💬 How can I assist you today?", disabled=client is None)
+    # main() has already returned if there is no client, so the input is always enabled
+    user_input = st.chat_input("💬 How can I assist you today?")
 
     if user_input:
         agent = st.session_state.agent_type
-        context = None
-        model_input = user_input
-        response = None
-        use_previous_context = False
-
-
-        if len(st.session_state.messages) > 1 and isinstance(st.session_state.messages[-1], AIMessage):
-            last_ai_response = st.session_state.messages[-1].content
-            if "context" in st.session_state and st.session_state.context:
-                use_previous_context = True
-        
-        # Handle simple chat when no agent is selected
-        if not agent or agent == "Select Agent":
-            # Simple chat loop with conversation history
-            with st.spinner("Thinking..."):
-                try:
-                    chat_history = st.session_state.messages + [HumanMessage(content=user_input)]
-                    response = get_chat_response(client, model_name, chat_history)
-                except Exception as e:
-                    response = f"Sorry, I encountered an error: {str(e)}"
-        
-        # Handle Document Agent queries
-        elif agent == "Document Agent":
-            if st.session_state.get("vector_store"):
-                if use_previous_context:
-                    # Use previous context for follow-up questions
-                    context = st.session_state.context
-                    model_input = f"""This is a follow-up question about the same document context. 
-                    Use the previous context to answer. If unclear, say you need more specific information.
-                    
-                    Previous Context:
-                    {context}
-                    
-                    Follow-up Question: {user_input}"""
-                else:
-                    # New question - get fresh context
-                    context = get_context_from_docs(user_input, st.session_state.vector_store)
-                    if context:
-                        st.session_state.context = context  # Store for possible follow-ups
-                        model_input = f"""You are a document assistant. Use this context to answer. 
-                        For follow-up questions, maintain context about these documents.
-                        
-                        Context:
-                        {context}
-                        
-                        Question: {user_input}"""
-                    else:
-                        response = "I can only answer questions about the uploaded documents. Please ask something related to the documents."
-            else:
-                response = "Please upload documents first before asking questions."
-        # Handle GitHub Repo Agent queries
-        elif agent == "GitHub Repo Agent":
-            if st.session_state.get("git_embedder"):
-                # Check if this is a follow-up question
-                if len(st.session_state.messages) > 1 and isinstance(st.session_state.messages[-1], AIMessage):
-                    last_ai_response = st.session_state.messages[-1].content
-                    # Use previous context for follow-up questions
-                    model_input = f"""This is a follow-up question about the same GitHub repository. 
-                    Use the previous conversation context to answer. If unclear, say you need more specific information.
-                    
-                    Previous AI Response:
-                    {last_ai_response}
-                    
-                    Follow-up Question: {user_input}
-                    
-                    Please maintain context from the previous conversation and respond appropriately."""
-                else:
-                    # New question - get fresh context
-                    context = st.session_state.git_embedder.get_context(user_input)
-                    if context:
-                        model_input = f"""You are a GitHub repository assistant. Use this code context to answer the question. 
-                        For follow-up questions, maintain context about this codebase.
-                        
-                        Code Context:
-                        {context}
-                        
-                        Question: {user_input}"""
-                    else:
-                        response = "I can only answer questions about the provided GitHub repository. Please ask something related to the codebase."
-            else:
-                response = "Please provide a GitHub repository URL and process it first before asking questions."
-
-        # Handle GitHub Code Modifier Agent queries
-        elif agent == "GitHub Code Modifier Agent":
-            if st.session_state.get("github_modifier_agent"):
-                try:
-                    # Initialize context if not exists
-                    if 'github_agent_context' not in st.session_state:
-                        st.session_state.github_agent_context = {
-                            'conversation_history': [],
-                            'last_action': None,
-                            'pending_action': None
-                        }
-                    
-                    # Add current input to context
-                    st.session_state.github_agent_context['conversation_history'].append({
-                        'user': user_input,
-                        'timestamp': len(st.session_state.github_agent_context['conversation_history'])
-                    })
-                    
-                    # Check if this is a follow-up to a previous action
-                    if len(st.session_state.messages) > 1 and isinstance(st.session_state.messages[-1], AIMessage):
-                        last_ai_response = st.session_state.messages[-1].content
-                        
-                        # If the last response mentioned an action that needs confirmation
-                        if any(keyword in last_ai_response.lower() for keyword in ['will proceed', 'going to', 'about to', 'confirm', 'proceed']):
-                            # This is likely a confirmation response
-                            if user_input.lower() in ['yes', 'confirm', 'proceed', 'ok', 'sure', 'do it']:
-                                # Execute the pending action
-                                if 'pending_action' in st.session_state:
-                                    action = st.session_state.pending_action
-                                    with st.spinner(f"Executing {action['type']}..."):
-                                        response = st.session_state.github_modifier_agent.run(action['command'])
-                                    # Clear pending action
-                                    del st.session_state.pending_action
-                                    st.session_state.github_agent_context['last_action'] = action
-                                else:
-                                    response = "I don't have a pending action to execute. Please specify what you'd like me to do."
-                            else:
-                                response = "Action cancelled. Please specify what you'd like me to do."
-                        else:
-                            # Regular conversation - maintain context
-                            context_prompt = f"""Previous conversation context:
-                            Last AI response: {last_ai_response}
-                            Conversation history: {st.session_state.github_agent_context['conversation_history'][-3:] if len(st.session_state.github_agent_context['conversation_history']) > 3 else st.session_state.github_agent_context['conversation_history']}
-                            
-                            Current user input: {user_input}
-                            
-                            Please maintain context from the previous conversation and respond appropriately. If the user is confirming an action, execute it. If they're asking a follow-up question, use the context from the previous response."""
-                            
-                            with st.spinner("Processing with GitHub Code Modifier Agent..."):
-                                response = st.session_state.github_modifier_agent.run(context_prompt)
-                    else:
-                        # First message or new conversation
-                        with st.spinner("Processing with GitHub Code Modifier Agent..."):
-                            response = st.session_state.github_modifier_agent.run(user_input)
-                            
-                        # Check if the response indicates a pending action that needs confirmation
-                        if any(keyword in response.lower() for keyword in ['will proceed', 'going to', 'about to', 'confirm', 'proceed']):
-                            # Store the action for confirmation
-                            st.session_state.pending_action = {
-                                'type': 'file_operation',
-                                'command': user_input,
-                                'response': response
-                            }
-                            
-                    # Update context with response
-                    st.session_state.github_agent_context['conversation_history'].append({
-                        'ai': response,
-                        'timestamp': len(st.session_state.github_agent_context['conversation_history'])
-                    })
-                            
-                except Exception as e:
-                    error_msg = str(e)
-                    st.error(f"Agent execution error: {error_msg}")
-                    
-                    # Provide specific guidance based on error type
-                    if "404" in error_msg and "Not Found" in error_msg:
-                        st.info("💡 This appears to be a file not found error. Please check the file path and ensure the file exists in the repository.")
-                    elif "'list' object has no attribute 'lower'" in error_msg:
-                        st.info("💡 This is an internal parsing error. Please try rephrasing your request.")
-                    elif "'dict' object has no attribute 'lower'" in error_msg:
-                        st.info("💡 This is an internal parsing error. Please try rephrasing your request or restart the agent.")
-                    elif "Authentication failed" in error_msg:
-                        st.info("💡 Please check your GitHub token permissions and ensure it has access to the repository.")
-                    else:
-                        st.info("💡 This might be due to network issues, model access problems, or repository permissions.")
-                    
-                    response = f"❌ Error using GitHub Code Modifier Agent: {error_msg}"
-            else:
-                response = "Please initialize the GitHub Code Modifier Agent first by providing a repository URL and clicking 'Initialize Code Modifier Agent'."
-
-        # Handle Web Scraping Agent queries
-        elif agent == "Web Scraping Agent":
-            if "web_scraping_agent" not in st.session_state:
-                # Initialize web scraping agent
-                tools = create_web_scraping_tools()
-                # Use the same API key and base as the main client
-                api_key = os.getenv("GITHUB_TOKEN") or os.getenv("OPENAI_API_KEY")
-                api_base = "https://models.github.ai/inference" if os.getenv("GITHUB_TOKEN") else None
-                
-                llm = ChatOpenAI(
-                    model=model_name, 
-                    temperature=0,
-                    openai_api_key=api_key,
-                    openai_api_base=api_base
-                )
-                st.session_state.web_scraping_agent = initialize_agent(
-                    tools, 
-                    llm, 
-                    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-                    verbose=True,
-                    handle_parsing_errors=True
-                )
-            
-            # Check if this is a follow-up question
-            if len(st.session_state.messages) > 1 and isinstance(st.session_state.messages[-1], AIMessage):
-                last_ai_response = st.session_state.messages[-1].content
-                # Add context to the user input for follow-up questions
-                contextualized_input = f"""Previous response: {last_ai_response}
-
-Follow-up question: {user_input}
-
-Please maintain context from the previous web scraping results and respond appropriately. If the user is asking for more details about previously scraped content, refer to that context."""
-            else:
-                contextualized_input = user_input
-            
-            with st.spinner("Processing with Web Scraping Agent..."):
-                try:
-                    response = st.session_state.web_scraping_agent.run(contextualized_input)
-                except Exception as e:
-                    response = f"❌ Error using Web Scraping Agent: {str(e)}"
-
-        # Handle Calculator Agent queries
-        elif agent == "Calculator Agent":
-            if "calculator_agent" not in st.session_state:
-                # Initialize calculator agent
-                tools = create_calculator_tools()
-                # Use the same API key and base as the main client
-                api_key = os.getenv("GITHUB_TOKEN") or os.getenv("OPENAI_API_KEY")
-                api_base = "https://models.github.ai/inference" if os.getenv("GITHUB_TOKEN") else None
-                
-                llm = ChatOpenAI(
-                    model=model_name, 
-                    temperature=0,
-                    openai_api_key=api_key,
-                    openai_api_base=api_base
-                )
-                st.session_state.calculator_agent = initialize_agent(
-                    tools, 
-                    llm, 
-                    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-                    verbose=True,
-                    handle_parsing_errors=True
-                )
-            
-            # Check if this is a follow-up question
-            if len(st.session_state.messages) > 1 and isinstance(st.session_state.messages[-1], AIMessage):
-                last_ai_response = st.session_state.messages[-1].content
-                # Add context to the user input for follow-up questions
-                contextualized_input = f"""Previous calculation result: {last_ai_response}
-
-Follow-up request: {user_input}
-
-Please maintain context from the previous calculation and respond appropriately. If the user is asking for calculations based on previous results, use those values."""
-            else:
-                contextualized_input = user_input
-            
-            with st.spinner("Processing with Calculator Agent..."):
-                try:
-                    response = st.session_state.calculator_agent.run(contextualized_input)
-                except Exception as e:
-                    response = f"❌ Error using Calculator Agent: {str(e)}"
+        handler = AGENT_DISPATCH.get(agent, run_default_chat)
+        response, model_input, context = handler(client, model_name, user_input, get_last_ai_response())
 
         # Get response from model if not already determined
         if response is None:
-            with st.spinner("Thinking..."):
-                try:
-                    chat_history = st.session_state.messages + [HumanMessage(content=model_input)]
-                    response = get_chat_response(client, model_name, chat_history)
-                    
-                    # Store the full context including the response for future reference
-                    if context and agent == "Document Agent":
-                        st.session_state.last_doc_context = {
-                            "question": user_input,
-                            "context": context,
-                            "response": response
-                        }
-                except Exception as e:
-                    response = f"Sorry, I encountered an error: {str(e)}"
+            try:
+                chat_history = chain(st.session_state.messages, (HumanMessage(content=model_input),))
+                # Agent prompts wrap the question in retrieved context, so only plain questions use the cache
+                cache_key = user_input if model_input == user_input else None
+                response = st.write_stream(stream_chat_response(client, model_name, chat_history, cache_key=cache_key))
+                
+                # Store the full context including the response for future reference
+                if context and agent == "Document Agent":
+                    st.session_state.last_doc_context = {
+                        "question": user_input,
+                        "context": context,
+                        "response": response
+                    }
+                    doc_cache_key = st.session_state.pop("doc_cache_key", None)
+                    if doc_cache_key and not response.startswith("Sorry, I encountered an error"):
+                        question, namespace = doc_cache_key
+                        get_semantic_cache().add(question, response, namespace=namespace)
+            except Exception as e:
+                response = f"Sorry, I encountered an error: {str(e)}"
 
         # Append messages to history
-        st.session_state.messages.append(HumanMessage(content=user_input))
+        add_chat_message(client, model_name, HumanMessage(content=user_input))
         
-        # Convert response to string if it's a dictionary
-        if isinstance(response, dict):
-            # Format dictionary response as a readable string
-            if 'commit' in response:
-                response_str = f"✅ Success! Commit: {response['commit']}\n\n"
-                if 'message' in response:
-                    response_str += f"Commit message: {response['message']}\n\n"
-                if 'content' in response and hasattr(response['content'], 'path'):
-                    response_str += f"File: {response['content'].path}"
-            else:
-                response_str = str(response)
-        else:
-            response_str = str(response)
-            
-        st.session_state.messages.append(AIMessage(content=response_str))
+        response_str = render_response(response)
+        add_chat_message(client, model_name, AIMessage(content=response_str))
         
         # Speak the response if voice output is enabled
         if st.session_state.voice_output_enabled and st.session_state.tts_working:
@@ -1266,9 +1717,9 @@ Please maintain context from the previous calculation and respond appropriately.
         st.rerun()
 
     # --- Display chat history with enhanced styling ---
-    if len(st.session_state.messages) > 1:  # Skip system prompt
+    if st.session_state.display_messages:
         
-        for i, msg in enumerate(st.session_state.messages[1:]):  # skip system prompt
+        for i, msg in enumerate(st.session_state.display_messages):
             if isinstance(msg, HumanMessage):
                 message(msg.content, is_user=True, key=f"user_{i}")
             elif isinstance(msg, AIMessage):
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+
+class BatchQueue:
+    def __init__(self, handler, max_batch_size: int = 8, max_wait: float = 0.05):
+        """
+        Coalesce concurrent requests into micro-batches
+
+        Requests submitted from any thread are collected on a background event
+        loop and passed to `handler` in groups of up to `max_batch_size`,
+        waiting at most `max_wait` seconds for a batch to fill.
+
+        Args:
+            handler: Coroutine function taking a list of items and returning a
+                list of results in the same order
+            max_batch_size: Maximum number of items per batch
+            max_wait: Maximum time in seconds to wait for a batch to fill
+        """
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._queue = None
+        self._tasks = set()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    async def _start(self):
+        """Create the queue and worker on the background loop"""
+        self._queue = asyncio.Queue()
+        self._spawn(self._worker())
+
+    def _spawn(self, coro):
+        """Schedule a task and keep a reference until it finishes"""
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _worker(self):
+        """Pop up to max_batch_size items, or whatever arrived within max_wait"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without blocking so the next batch can start filling
+            self._spawn(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        """Run the handler on one batch and resolve each request's future"""
+        items = [item for item, _ in batch]
+        try:
+            results = await self.handler(items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _enqueue(self, item):
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def submit(self, item, timeout: float = None):
+        """
+        Submit one item and block until its result is ready
+
+        Args:
+            item: Item to pass to the handler as part of a batch
+            timeout: Maximum time in seconds to wait for the result
+
+        Returns:
+            The handler's result for this item
+        """
+        return asyncio.run_coroutine_threadsafe(self._enqueue(item), self._loop).result(timeout)
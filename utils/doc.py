@@ -1,18 +1,44 @@
-from PyPDF2 import PdfReader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-import hashlib
+from blake3 import blake3
+import streamlit as st
+from utils.embeddings import add_texts_batched, get_embedder, iter_unique
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import io
 import os
 
 
 def get_pdf_text(pdf_docs):
-    text = ""
-    for pdf in pdf_docs:
-        pdf_reader = PdfReader(pdf)
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-    return text
+    return "".join(_extract_pdf_bytes(pdf.getvalue()) for pdf in pdf_docs)
+
+
+def _extract_pdf_bytes(pdf_bytes):
+    """Extract the text of one PDF (runs in a worker process)"""
+    # PyMuPDF parses PDFs in C; PyPDF2 is kept as a fallback when it is not installed
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+
+    if fitz is not None:
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            return "".join(page.get_text() for page in doc)
+
+    from PyPDF2 import PdfReader
+    pdf_reader = PdfReader(io.BytesIO(pdf_bytes))
+    return "".join(page.extract_text() for page in pdf_reader.pages)
+
+
+def iter_pdf_texts(pdf_docs, max_workers=None):
+    """
+    Extract text from several PDFs in parallel processes
+
+    Yields one text per document as soon as it is parsed, so chunking can
+    start before every file is done.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = [executor.submit(_extract_pdf_bytes, pdf.getvalue()) for pdf in pdf_docs]
+        for future in as_completed(futures):
+            yield future.result()
 
 
 def get_text_chunks(text):
@@ -20,26 +46,50 @@ def get_text_chunks(text):
     return text_splitter.split_text(text)
 
 
+def iter_text_chunks(texts):
+    """Split a stream of document texts into chunks without joining them first"""
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    for text in texts:
+        yield from text_splitter.split_text(text)
+
+
+@st.cache_data(show_spinner=False)
+def _get_file_hash(name, size, head, _pdf):
+    """BLAKE3 digest of one uploaded file, memoized on (name, size, first 4KB)"""
+    # Hash the upload's buffer in 1MB slices of a zero-copy view instead of copying it out
+    hasher = blake3()
+    with _pdf.getbuffer() as view:
+        for start in range(0, len(view), 1 << 20):
+            hasher.update(view[start:start + (1 << 20)])
+    return hasher.hexdigest()
+
+
 def get_documents_hash(pdf_docs):
     """Generate a unique hash for the uploaded documents"""
-    hasher = hashlib.md5()
+    digests = []
     for pdf in pdf_docs:
-        hasher.update(pdf.getvalue())
-    return hasher.hexdigest()
+        head = bytes(pdf.getbuffer()[:4096])
+        digests.append(_get_file_hash(pdf.name, pdf.size, head, pdf))
+    return blake3("".join(sorted(digests)).encode()).hexdigest()
 
 
 def build_vector_store(chunks, persist_dir="chroma_doc_store"):
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    vector_store = Chroma.from_texts(
-        texts=chunks,
-        embedding=embeddings,
-        persist_directory=persist_dir
+    from langchain_community.vectorstores import Chroma
+    vector_store = Chroma(
+        persist_directory=persist_dir,
+        embedding_function=get_embedder()
     )
+    add_texts_batched(vector_store, iter_unique(chunks))
+    # Drop any handle opened before this rebuild
+    load_vector_store.clear()
     return vector_store
 
 
+@st.cache_resource(show_spinner=False)
 def load_vector_store(persist_dir="chroma_doc_store"):
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    """Open the persisted store once and keep it in memory across reruns"""
+    from langchain_community.vectorstores import Chroma
+    embeddings = get_embedder()
     return Chroma(
         persist_directory=persist_dir,
         embedding_function=embeddings
@@ -53,9 +103,9 @@ def get_context_from_docs(query, vector_store, previous_context=None):
     if previous_context:
         # For follow-up questions, include previous context in the search
         extended_query = f"{previous_context}\n\nFollow-up: {query}"
-        docs = vector_store.similarity_search(extended_query, k=5)
+        docs = vector_store.similarity_search_by_vector(get_embedder().embed_query(extended_query), k=5)
     else:
-        docs = vector_store.similarity_search(query, k=3)
+        docs = vector_store.similarity_search_by_vector(get_embedder().embed_query(query), k=3)
     
     # Filter and format the context
     if not docs:
@@ -0,0 +1,181 @@
+import functools
+import hashlib
+import os
+import platform
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from langchain_core.embeddings import Embeddings
+
+# Settings
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+ONNX_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ask-llama", "all-MiniLM-L6-v2-onnx")
+
+
+class SentenceEmbeddings(Embeddings):
+    def __init__(self, model, batch_size: int = 64):
+        """
+        LangChain embeddings backed by a Sentence-Transformers model
+
+        Args:
+            model: Loaded Sentence-Transformers model (PyTorch or ONNX backend)
+            batch_size: Number of texts encoded per forward pass
+        """
+        self.model = model
+        self.batch_size = batch_size
+
+    def embed_documents(self, texts):
+        embeddings = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+        return embeddings.tolist()
+
+    def embed_query(self, text):
+        # Retrieval and the semantic cache embed the same question, so encode it once
+        return list(self._embed_query_cached(text))
+
+    @functools.lru_cache(maxsize=256)
+    def _embed_query_cached(self, text):
+        return tuple(self.embed_documents([text])[0])
+
+
+def _quantization_config() -> str:
+    """Pick the ONNX Runtime INT8 kernel set for this CPU"""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    return "avx512_vnni"
+
+
+def _session_options():
+    """ONNX Runtime session options that use every core for intra-op work"""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = os.cpu_count() or 1
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+def _load_quantized_model():
+    """Load the INT8 ONNX model, exporting and quantizing it on first use"""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    config = _quantization_config()
+    file_name = f"onnx/model_qint8_{config}.onnx"
+    if not os.path.exists(os.path.join(ONNX_CACHE_DIR, file_name)):
+        model = SentenceTransformer(EMBEDDING_MODEL, backend="onnx", device="cpu")
+        model.save_pretrained(ONNX_CACHE_DIR)
+        export_dynamic_quantized_onnx_model(model, config, ONNX_CACHE_DIR)
+
+    return SentenceTransformer(
+        ONNX_CACHE_DIR,
+        backend="onnx",
+        device="cpu",
+        model_kwargs={"file_name": file_name, "session_options": _session_options()}
+    )
+
+
+def _load_torch_model():
+    """Load the FP32 PyTorch model with intra-op threads on every core"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(os.cpu_count() or 1)
+    torch.backends.mkldnn.enabled = True
+    return SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+
+
+@functools.lru_cache(maxsize=1)
+def get_embedder() -> SentenceEmbeddings:
+    """
+    Embeddings for all-MiniLM-L6-v2 using a dynamically quantized ONNX model
+
+    The model is loaded once per process and shared by every caller. Falls
+    back to the FP32 PyTorch model when ONNX Runtime / Optimum are not
+    available.
+
+    Returns:
+        LangChain-compatible embeddings object
+    """
+    try:
+        model = _load_quantized_model()
+    except Exception:
+        model = _load_torch_model()
+    return SentenceEmbeddings(model)
+
+
+def iter_unique(items, key=None):
+    """
+    Yield items whose text has not been seen before
+
+    Repeated chunks (license headers, boilerplate, copied code) would
+    otherwise be embedded and stored once per copy.
+
+    Args:
+        items: Iterable of texts or objects, consumed lazily
+        key: Optional function returning the text to compare for each item
+    """
+    seen = set()
+    for item in items:
+        text = item if key is None else key(item)
+        digest = hashlib.blake2b(text.encode("utf-8", "ignore"), digest_size=8).digest()
+        if digest not in seen:
+            seen.add(digest)
+            yield item
+
+
+def add_texts_batched(vector_store, texts, metadatas=None, batch_size: int = 512):
+    """
+    Embed and insert texts into a Chroma store in fixed-size batches
+
+    Peak memory and the size of each insert stay bounded by `batch_size`
+    instead of growing with the whole corpus. Each batch is written on a
+    background thread while the next one is being embedded, so the SQLite
+    writes overlap with the model's forward passes.
+
+    The public add_texts embeds inside the call, so splitting the embedding
+    from the write needs the store's underlying Chroma collection. Stores
+    without one fall back to add_texts, one batch at a time.
+
+    Args:
+        vector_store: LangChain Chroma vector store
+        texts: Iterable of texts, consumed lazily
+        metadatas: Optional iterable of metadata dicts aligned with `texts`
+        batch_size: Number of texts embedded and inserted per call
+    """
+    texts = iter(texts)
+    metadatas = iter(metadatas) if metadatas is not None else None
+    collection = getattr(vector_store, "_collection", None)
+    if collection is None:
+        while True:
+            batch = list(islice(texts, batch_size))
+            if not batch:
+                return
+            batch_metadatas = list(islice(metadatas, len(batch))) if metadatas is not None else None
+            vector_store.add_texts(batch, metadatas=batch_metadatas)
+
+    embedder = vector_store.embeddings
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        pending = None
+        while True:
+            batch = list(islice(texts, batch_size))
+            if not batch:
+                break
+            batch_metadatas = list(islice(metadatas, len(batch))) if metadatas is not None else None
+            embeddings = embedder.embed_documents(batch)
+            # Keep at most one write in flight; this also surfaces its errors
+            if pending is not None:
+                pending.result()
+            pending = writer.submit(
+                collection.add,
+                ids=[str(uuid.uuid4()) for _ in batch],
+                embeddings=embeddings,
+                documents=batch,
+                metadatas=batch_metadatas
+            )
+        if pending is not None:
+            pending.result()
@@ -0,0 +1,94 @@
+import math
+import os
+import pickle
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+
+# Product quantization: 48 sub-vectors of 8 bits each for 384-d MiniLM embeddings
+PQ_SUBQUANTIZERS = 48
+PQ_BITS = 8
+
+
+class FaissStore:
+    def __init__(self, index, documents, embedder, nprobe: int = 16):
+        """
+        Compressed FAISS index for very large corpora
+
+        Args:
+            index: Trained FAISS IVF-PQ index whose ids are positions in `documents`
+            documents: List of (text, metadata) pairs
+            embedder: LangChain embeddings used to encode queries
+            nprobe: Number of inverted lists scanned per query (higher = better recall)
+        """
+        self.index = index
+        self.index.nprobe = nprobe
+        self.documents = documents
+        self.embedder = embedder
+
+    @classmethod
+    def build(cls, texts, metadatas, embedder, persist_dir: str, batch_size: int = 512):
+        """
+        Embed texts into an IVF-PQ index and save it to `persist_dir`
+
+        Args:
+            texts: List of chunk texts
+            metadatas: List of metadata dicts aligned with `texts`
+            embedder: LangChain embeddings used for documents and queries
+            persist_dir: Directory the index and documents are written to
+            batch_size: Number of texts embedded per call
+
+        Returns:
+            FaissStore over the new index
+        """
+        vectors = np.vstack([
+            np.asarray(embedder.embed_documents(texts[i:i + batch_size]), dtype="float32")
+            for i in range(0, len(texts), batch_size)
+        ])
+        n, dim = vectors.shape
+
+        # Embeddings are normalized, so inner product is cosine similarity
+        nlist = max(1, int(math.sqrt(n)))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, PQ_SUBQUANTIZERS, PQ_BITS, faiss.METRIC_INNER_PRODUCT)
+
+        # Train on a sample; FAISS wants roughly 40-256 points per centroid
+        sample_size = min(n, 256 * nlist)
+        sample = vectors[np.random.default_rng(0).choice(n, sample_size, replace=False)]
+        index.train(sample)
+        index.add_with_ids(vectors, np.arange(n, dtype="int64"))
+
+        store = cls(index, list(zip(texts, metadatas)), embedder)
+        store.save(persist_dir)
+        return store
+
+    @classmethod
+    def load(cls, persist_dir: str, embedder):
+        """Load an index saved with `save`"""
+        index_path, documents_path = cls._paths(persist_dir)
+        index = faiss.read_index(index_path)
+        with open(documents_path, "rb") as f:
+            documents = pickle.load(f)
+        return cls(index, documents, embedder)
+
+    def save(self, persist_dir: str):
+        os.makedirs(persist_dir, exist_ok=True)
+        index_path, documents_path = self._paths(persist_dir)
+        faiss.write_index(self.index, index_path)
+        with open(documents_path, "wb") as f:
+            pickle.dump(self.documents, f)
+
+    @staticmethod
+    def _paths(persist_dir: str):
+        return (os.path.join(persist_dir, "index.faiss"),
+                os.path.join(persist_dir, "documents.pkl"))
+
+    def similarity_search(self, query: str, k: int = 4):
+        """Return the `k` documents closest to `query`"""
+        embedding = np.asarray([self.embedder.embed_query(query)], dtype="float32")
+        _, ids = self.index.search(embedding, k)
+        return [
+            Document(page_content=self.documents[i][0], metadata=self.documents[i][1])
+            for i in ids[0] if i >= 0
+        ]
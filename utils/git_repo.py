@@ -1,15 +1,39 @@
+import functools
 import os
-import git
+import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from queue import Queue
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import CharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from utils.embeddings import add_texts_batched, get_embedder, iter_unique
 
 # Settings
-allowed_extensions = ['.py', '.ipynb', '.md']
-model_name = "sentence-transformers/all-MiniLM-L6-v2"
-model_kwargs = {"device": "cpu"}
+allowed_extensions = {'.py', '.ipynb', '.md'}
+# Repositories with more chunks than this use a compressed FAISS index instead of Chroma
+FAISS_MIN_CHUNKS = 50_000
+
+
+def _load_document(path):
+    """Read one source file as a Document (undecodable bytes are dropped)"""
+    return Document(
+        page_content=path.read_text(encoding="utf-8", errors="ignore"),
+        metadata={"source": str(path)}
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _get_splitter():
+    """Splitter that measures chunks in the embedder's own tokens (MiniLM reads at most 256)"""
+    tokenizer = get_embedder().model.tokenizer
+    return RecursiveCharacterTextSplitter.from_huggingface_tokenizer(tokenizer, chunk_size=256, chunk_overlap=32)
+
+
+def _chmod_retry(func, path, exc_info):
+    """rmtree error handler: make read-only files (e.g. git packs) writable and retry"""
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
 
 
 class GitCodeEmbedder:
@@ -19,49 +43,62 @@ class GitCodeEmbedder:
         self.repo_name = last_name.split('.')[0]
         self.clone_path = self.repo_name
         self.vectorstore_path = f"chroma_git_store/{self.repo_name}"
+        self.faiss_path = f"faiss_git_store/{self.repo_name}"
 
-        self.embedder = HuggingFaceEmbeddings(model_name=model_name, model_kwargs=model_kwargs)
+        self.embedder = get_embedder()
         self.chat_history = Queue(maxsize=3)
 
     def clone_repo(self):
+        import git
+
         if not os.path.exists(self.clone_path):
-            git.Repo.clone_from(self.git_link, self.clone_path)
+            # Only the current tree is indexed, so skip history and other branches
+            git.Repo.clone_from(self.git_link, self.clone_path, multi_options=["--depth=1", "--single-branch"])
 
     def extract_and_chunk(self):
-        docs = []
-        for dirpath, _, filenames in os.walk(self.clone_path):
-            for file in filenames:
-                ext = os.path.splitext(file)[1]
-                if ext in allowed_extensions:
-                    try:
-                        loader = TextLoader(os.path.join(dirpath, file), encoding="utf-8")
-                        docs.extend(loader.load_and_split())
-                    except Exception:
-                        pass
-
-        splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        self.texts = splitter.split_documents(docs)
+        # Reading files is I/O-bound, so they are loaded concurrently
+        files = [p for p in Path(self.clone_path).rglob("*") if p.suffix in allowed_extensions and p.is_file()]
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            docs = list(executor.map(_load_document, files))
+
+        chunks = _get_splitter().split_documents(docs)
+        self.texts = list(iter_unique(chunks, key=lambda doc: doc.page_content))
 
     def build_vectorstore(self):
-        db = Chroma.from_documents(
-            documents=self.texts,
-            embedding=self.embedder,
-            persist_directory=self.vectorstore_path
+        if len(self.texts) > FAISS_MIN_CHUNKS:
+            from utils.faiss_store import FaissStore
+            db = FaissStore.build(
+                [doc.page_content for doc in self.texts],
+                [doc.metadata for doc in self.texts],
+                self.embedder,
+                self.faiss_path
+            )
+            self.delete_repo_clone()
+            return db
+
+        from langchain_community.vectorstores import Chroma
+        db = Chroma(
+            persist_directory=self.vectorstore_path,
+            embedding_function=self.embedder
+        )
+        add_texts_batched(
+            db,
+            (doc.page_content for doc in self.texts),
+            (doc.metadata for doc in self.texts)
         )
         self.delete_repo_clone()
         return db
 
     def delete_repo_clone(self):
         if os.path.exists(self.clone_path):
-            for root, dirs, files in os.walk(self.clone_path, topdown=False):
-                for f in files:
-                    os.remove(os.path.join(root, f))
-                for d in dirs:
-                    os.rmdir(os.path.join(root, d))
-            os.rmdir(self.clone_path)
+            shutil.rmtree(self.clone_path, onerror=_chmod_retry)
 
     def load_or_create_db(self):
-        if os.path.exists(self.vectorstore_path):
+        if os.path.exists(self.faiss_path):
+            from utils.faiss_store import FaissStore
+            self.db = FaissStore.load(self.faiss_path, self.embedder)
+        elif os.path.exists(self.vectorstore_path):
+            from langchain_community.vectorstores import Chroma
             self.db = Chroma(
                 persist_directory=self.vectorstore_path,
                 embedding_function=self.embedder
@@ -71,13 +108,12 @@ class GitCodeEmbedder:
             self.extract_and_chunk()
             self.db = self.build_vectorstore()
 
-        self.retriever = self.db.as_retriever(search_type="similarity", search_kwargs={"k": 3})
-
     def get_context(self, query):
-        if not hasattr(self, "retriever"):
+        if not hasattr(self, "db"):
             raise ValueError("Vectorstore not loaded. Run `load_or_create_db()` first.")
 
-        docs = self.retriever.get_relevant_documents(query)
+        # Chroma and FaissStore share the similarity_search interface
+        docs = self.db.similarity_search(query, k=3)
 
         # Strict check: empty or irrelevant docs
         if not docs or all(len(doc.page_content.strip()) == 0 for doc in docs):
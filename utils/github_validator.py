@@ -1,7 +1,46 @@
 import os
-from github import Github, GithubException
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import requests
+from github import Github
 from typing import Dict, List, Tuple
 
+GITHUB_API_URL = "https://api.github.com"
+
+# One keep-alive session for the validator's REST calls; only a few JSON fields are needed
+_SESSION = requests.Session()
+_SESSION.headers["Accept"] = "application/vnd.github+json"
+
+
+@lru_cache(maxsize=8)
+def _client_for(token: str) -> Github:
+    """Shared GitHub client per token, so repeated validations reuse one connection pool"""
+    return Github(token)
+
+
+def _api_get(token: str, path: str) -> Dict:
+    """GET a GitHub REST endpoint and return its JSON, raising HTTPError on failure"""
+    response = _SESSION.get(
+        f"{GITHUB_API_URL}{path}",
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@lru_cache(maxsize=8)
+def _user_login(token: str) -> str:
+    """Login of the token's user; failed lookups raise and are not cached"""
+    return _api_get(token, "/user")["login"]
+
+
+@lru_cache(maxsize=256)
+def _parse_repo_path(repo_url: str) -> str:
+    """Turn a repository URL into an owner/name path"""
+    _, _, tail = repo_url.partition('github.com/')
+    return (tail or repo_url).removesuffix('.git')
+
 
 def validate_github_setup(github_token: str = None, repo_url: str = None) -> Dict:
     """
@@ -25,25 +64,22 @@ def validate_github_setup(github_token: str = None, repo_url: str = None) -> Dic
     
     try:
         # Test GitHub API connection
-        github = Github(github_token)
-        user = github.get_user()
-        
         result = {
             "success": True,
-            "user": user.login,
+            "user": _user_login(github_token),
             "token_valid": True,
             "repositories": []
         }
         
         # Test repository access if URL provided
         if repo_url:
-            repo_result = validate_repository_access(github, repo_url)
+            repo_result = validate_repository_access(github_token, repo_url)
             result.update(repo_result)
         
         return result
         
-    except GithubException as e:
-        if e.status == 401:
+    except requests.HTTPError as e:
+        if e.response.status_code == 401:
             return {
                 "success": False,
                 "error": "Invalid GitHub token. Please check your GITHUB_API_TOKEN"
@@ -60,43 +96,39 @@ def validate_github_setup(github_token: str = None, repo_url: str = None) -> Dic
         }
 
 
-def validate_repository_access(github: Github, repo_url: str) -> Dict:
+def validate_repository_access(github_token: str, repo_url: str) -> Dict:
     """
     Validate access to a specific repository
     
     Args:
-        github: GitHub API client
+        github_token: GitHub API token
         repo_url: Repository URL to test
         
     Returns:
         Dictionary with repository validation results
     """
     try:
-        # Parse repository URL
-        if 'github.com' in repo_url:
-            repo_path = repo_url.split('github.com/')[-1]
-            if repo_path.endswith('.git'):
-                repo_path = repo_path[:-4]
-        else:
-            repo_path = repo_url
+        repo_path = _parse_repo_path(repo_url)
         
         # Test repository access
-        repo = github.get_repo(repo_path)
+        repo = _api_get(github_token, f"/repos/{repo_path}")
+        permissions = repo.get("permissions", {})
         
         return {
             "repo_accessible": True,
-            "repo_name": repo.full_name,
-            "repo_url": repo.html_url,
-            "repo_private": repo.private,
+            "repo_name": repo["full_name"],
+            "repo_url": repo["html_url"],
+            "repo_private": repo["private"],
             "permissions": {
-                "admin": repo.permissions.admin,
-                "push": repo.permissions.push,
-                "pull": repo.permissions.pull
+                "admin": permissions.get("admin", False),
+                "push": permissions.get("push", False),
+                "pull": permissions.get("pull", False)
             }
         }
         
-    except GithubException as e:
-        if e.status == 404:
+    except requests.HTTPError as e:
+        status = e.response.status_code
+        if status == 404:
             return {
                 "repo_accessible": False,
                 "error": f"Repository not found: {repo_url}",
@@ -106,7 +138,7 @@ def validate_repository_access(github: Github, repo_url: str) -> Dict:
                     "Ensure your token has access to this repository"
                 ]
             }
-        elif e.status == 401:
+        elif status == 401:
             return {
                 "repo_accessible": False,
                 "error": "Authentication failed for repository access",
@@ -145,46 +177,64 @@ def list_accessible_repositories(github_token: str = None, limit: int = 10) -> L
         return []
     
     try:
-        github = Github(github_token)
-        user = github.get_user()
-        
-        repos = []
-        for repo in user.get_repos()[:limit]:
-            repos.append({
-                "name": repo.name,
-                "full_name": repo.full_name,
-                "url": repo.html_url,
-                "private": repo.private,
-                "description": repo.description
-            })
+        user = _client_for(github_token).get_user()
         
-        return repos
+        # The fields are all in the list payload, so no per-repo requests are made
+        return [_repo_dict(repo) for repo in user.get_repos()[:limit]]
         
     except Exception as e:
         return []
 
 
-def test_repository_operations(github: Github, repo_url: str) -> Dict:
+def _repo_dict(repo) -> Dict:
+    """Summary of a repository for list_accessible_repositories"""
+    return {
+        "name": repo.name,
+        "full_name": repo.full_name,
+        "url": repo.html_url,
+        "private": repo.private,
+        "description": repo.description
+    }
+
+
+def _probe(call) -> bool:
+    """Run a repository call and report whether it succeeded"""
+    try:
+        call()
+        return True
+    except Exception:
+        return False
+
+
+def _can_read_contents(token: str, repo_path: str) -> bool:
+    """Check read access with the single-file README, listing the root only when there is none"""
+    try:
+        _api_get(token, f"/repos/{repo_path}/readme")
+        return True
+    except requests.HTTPError as e:
+        # Any other status (403, 5xx) already answers the question
+        if e.response.status_code != 404:
+            return False
+    except Exception:
+        return False
+    return _probe(lambda: _api_get(token, f"/repos/{repo_path}/contents/"))
+
+
+def test_repository_operations(github_token: str, repo_url: str) -> Dict:
     """
     Test basic repository operations
     
     Args:
-        github: GitHub API client
+        github_token: GitHub API token
         repo_url: Repository URL to test
         
     Returns:
         Dictionary with operation test results
     """
     try:
-        # Parse repository URL
-        if 'github.com' in repo_url:
-            repo_path = repo_url.split('github.com/')[-1]
-            if repo_path.endswith('.git'):
-                repo_path = repo_path[:-4]
-        else:
-            repo_path = repo_url
+        repo_path = _parse_repo_path(repo_url)
         
-        repo = github.get_repo(repo_path)
+        repo = _api_get(github_token, f"/repos/{repo_path}")
         
         # Test basic operations
         operations = {
@@ -194,23 +244,20 @@ def test_repository_operations(github: Github, repo_url: str) -> Dict:
             "write_access": False
         }
         
-        # Test reading contents
-        try:
-            contents = repo.get_contents("")
-            operations["read_contents"] = True
-            operations["list_files"] = True
-        except:
-            pass
-        
-        # Test branch creation (if we have write access)
-        if repo.permissions.push:
-            operations["write_access"] = True
-            try:
-                # Try to create a test branch (will fail if branch exists, but that's okay)
-                main_branch = repo.get_branch("main")
-                operations["create_branch"] = True
-            except:
-                pass
+        # Test reading contents, and branch access alongside it when we have write access
+        can_push = bool(repo.get("permissions", {}).get("push"))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            read_probe = executor.submit(_can_read_contents, github_token, repo_path)
+            branch_probe = (
+                executor.submit(_probe, lambda: _api_get(github_token, f"/repos/{repo_path}/branches/main"))
+                if can_push else None
+            )
+            
+            operations["read_contents"] = operations["list_files"] = read_probe.result()
+            
+            if can_push:
+                operations["write_access"] = True
+                operations["create_branch"] = branch_probe.result()
         
         return {
             "success": True,
@@ -0,0 +1,144 @@
+import atexit
+import os
+import pickle
+import threading
+import time
+
+import faiss
+import numpy as np
+
+from utils.embeddings import get_embedder
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = 0.9, ttl: float = 3600, persist_dir: str = "semantic_cache",
+                 persist_interval: float = 60):
+        """
+        Embedding-based cache for LLM completions
+
+        Args:
+            threshold: Minimum cosine similarity for a cached prompt to count as a hit
+            ttl: Time in seconds a cached completion stays valid
+            persist_dir: Directory the index is saved to (None to keep it in memory only)
+            persist_interval: Seconds between background saves of new entries
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.persist_dir = persist_dir
+        self.persist_interval = persist_interval
+        # Prompts are embedded with the process-wide MiniLM model shared with the vector stores
+        self.model = get_embedder().model
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self._lock = threading.Lock()
+        # Serializes writers so a timed save and the exit save never interleave
+        self._save_lock = threading.Lock()
+        self._dirty = False
+
+        # Entries are (namespace, completion, expires_at), aligned with index ids
+        self.index = faiss.IndexFlatIP(self.dim)
+        self.entries = []
+        self._load()
+
+        # Adds only mark the cache dirty; it is written on a timer and at exit
+        # instead of rewriting the whole index on every turn
+        if self.persist_dir:
+            threading.Thread(target=self._persist_loop, name="semantic-cache-saver", daemon=True).start()
+            atexit.register(self.flush)
+
+    def _embed(self, text: str) -> np.ndarray:
+        # Shares the embedder's query cache with document retrieval
+        return np.asarray([get_embedder().embed_query(text)], dtype="float32")
+
+    def lookup(self, text: str, namespace: str = "", k: int = 4, threshold: float = None):
+        """
+        Return a cached completion for a semantically similar prompt
+
+        Args:
+            text: Prompt to look up
+            namespace: Only entries stored under the same namespace can match
+            k: Number of nearest neighbours to inspect
+            threshold: Overrides the cache's similarity threshold for this lookup
+
+        Returns:
+            The cached completion, or None on a miss
+        """
+        if self.index.ntotal == 0:
+            return None
+
+        threshold = self.threshold if threshold is None else threshold
+        embedding = self._embed(text)
+        now = time.time()
+        with self._lock:
+            scores, ids = self.index.search(embedding, min(k, self.index.ntotal))
+            for score, idx in zip(scores[0], ids[0]):
+                if idx < 0 or score < threshold:
+                    break
+                entry_namespace, completion, expires_at = self.entries[idx]
+                if entry_namespace == namespace and expires_at > now:
+                    return completion
+        return None
+
+    def add(self, text: str, completion: str, namespace: str = ""):
+        """Store a completion for a prompt; it is persisted by the next flush"""
+        embedding = self._embed(text)
+        with self._lock:
+            self._evict_expired()
+            self.index.add(embedding)
+            self.entries.append((namespace, completion, time.time() + self.ttl))
+            self._dirty = True
+
+    def _evict_expired(self):
+        """Rebuild the index without expired entries"""
+        now = time.time()
+        keep = [i for i, entry in enumerate(self.entries) if entry[2] > now]
+        if len(keep) == len(self.entries):
+            return
+
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)[keep] if keep else None
+        self.index = faiss.IndexFlatIP(self.dim)
+        if vectors is not None:
+            self.index.add(vectors)
+        self.entries = [self.entries[i] for i in keep]
+
+    def _paths(self):
+        return (os.path.join(self.persist_dir, "index.faiss"),
+                os.path.join(self.persist_dir, "entries.pkl"))
+
+    def _load(self):
+        if not self.persist_dir:
+            return
+        index_path, entries_path = self._paths()
+        if os.path.exists(index_path) and os.path.exists(entries_path):
+            try:
+                index = faiss.read_index(index_path)
+                with open(entries_path, "rb") as f:
+                    entries = pickle.load(f)
+                if index.ntotal == len(entries) and index.d == self.dim:
+                    self.index, self.entries = index, entries
+            except Exception:
+                pass
+
+    def _persist_loop(self):
+        while True:
+            time.sleep(self.persist_interval)
+            self.flush()
+
+    def flush(self):
+        """Write the index and entries to disk if anything changed since the last save"""
+        if not self.persist_dir:
+            return
+        with self._save_lock:
+            # Snapshot under the lock, then write without blocking lookups
+            with self._lock:
+                if not self._dirty:
+                    return
+                index_bytes = faiss.serialize_index(self.index)
+                entries = list(self.entries)
+                self._dirty = False
+
+            os.makedirs(self.persist_dir, exist_ok=True)
+            index_path, entries_path = self._paths()
+            # serialize_index produces the same bytes write_index would
+            index_bytes.tofile(index_path)
+            with open(entries_path, "wb") as f:
+                pickle.dump(entries, f)
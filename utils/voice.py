@@ -1,18 +1,111 @@
 import streamlit as st
-import speech_recognition as sr
+import importlib.util
+import json
+import queue
+import re
 import subprocess
+import threading
+import time
+from concurrent.futures import Future
 
+# Checked without importing, so the library is only loaded once voice input is used
+SR_AVAILABLE = importlib.util.find_spec("speech_recognition") is not None
+# Offline recognition is used when Vosk is installed, otherwise Google's web API
+VOSK_AVAILABLE = importlib.util.find_spec("vosk") is not None
+
+# Seconds before the ambient noise floor is measured again
+NOISE_RECALIBRATE_SECONDS = 300
+
+# Sample rate the Vosk model expects
+VOSK_SAMPLE_RATE = 16000
 
 
 # --- Voice input function ---
-def listen(recognizer):
+def get_microphone():
+    """Return the session's Microphone, constructed once"""
+    if 'microphone' not in st.session_state:
+        import speech_recognition as sr
+        st.session_state.microphone = sr.Microphone()
+    return st.session_state.microphone
+
+
+def init_voice():
+    """
+    Set up the session's calibrated Recognizer and Microphone
+
+    The recognizer is created once; its noise floor is measured on first use
+    and again only once it is older than NOISE_RECALIBRATE_SECONDS.
+
+    Returns:
+        Tuple of (recognizer, microphone)
+    """
+    if not st.session_state.get('voice_initialized'):
+        import speech_recognition as sr
+        recognizer = sr.Recognizer()
+        # Keep the calibrated threshold instead of re-adjusting during every phrase
+        recognizer.dynamic_energy_threshold = False
+        st.session_state.recognizer = recognizer
+        st.session_state.voice_initialized = True
+    
+    recognizer = st.session_state.recognizer
+    if time.time() - st.session_state.get('noise_floor_ts', 0) > NOISE_RECALIBRATE_SECONDS:
+        with get_microphone() as source:
+            recognizer.adjust_for_ambient_noise(source, duration=0.5)
+        st.session_state.noise_floor_ts = time.time()
+    return recognizer, st.session_state.microphone
+
+
+# The offline model is loaded once per process on a background thread; until it
+# is ready, or if loading failed, recognition uses Google's web API
+_VOSK_LOAD_FAILED = object()
+_VOSK_MODEL = None
+_VOSK_LOADER = None
+_VOSK_LOCK = threading.Lock()
+
+
+def _load_vosk_model():
+    """Load the English Vosk model (downloaded on first use), recording a failure once"""
+    global _VOSK_MODEL
     try:
-        with sr.Microphone() as source:
-            # Adjust for ambient noise with longer duration for better detection
-            recognizer.adjust_for_ambient_noise(source, duration=1.0)
-            # Set microphone sensitivity
-            recognizer.energy_threshold = 300  # Lower threshold for better sensitivity
-            recognizer.dynamic_energy_threshold = True
+        import vosk
+        vosk.SetLogLevel(-1)
+        _VOSK_MODEL = vosk.Model(lang="en-us")
+    except Exception:
+        _VOSK_MODEL = _VOSK_LOAD_FAILED
+
+
+def warm_up_voice():
+    """Start loading the offline speech model in the background, once per process"""
+    global _VOSK_LOADER
+    if not VOSK_AVAILABLE:
+        return
+    with _VOSK_LOCK:
+        if _VOSK_LOADER is None:
+            _VOSK_LOADER = threading.Thread(target=_load_vosk_model, name="vosk-loader", daemon=True)
+            _VOSK_LOADER.start()
+
+
+def _recognize(recognizer, audio):
+    """Transcribe audio locally with Vosk, falling back to Google if it is unavailable or fails"""
+    model = _VOSK_MODEL
+    if model is not None and model is not _VOSK_LOAD_FAILED:
+        try:
+            import vosk
+            rec = vosk.KaldiRecognizer(model, VOSK_SAMPLE_RATE)
+            rec.AcceptWaveform(audio.get_raw_data(convert_rate=VOSK_SAMPLE_RATE, convert_width=2))
+            return json.loads(rec.FinalResult()).get("text", "")
+        except Exception:
+            pass
+    return recognizer.recognize_google(audio)
+
+
+def listen():
+    if not SR_AVAILABLE:
+        return "Sorry, speech recognition is not installed."
+    import speech_recognition as sr
+    try:
+        recognizer, microphone = init_voice()
+        with microphone as source:
             st.toast("🎙 Listening... Speak now!")
             
             # Listen with longer timeout and phrase time limit
@@ -24,7 +117,7 @@ def listen(recognizer):
             
         # Try to recognize the speech
         try:
-            text = recognizer.recognize_google(audio)
+            text = _recognize(recognizer, audio)
             if text and text.strip():
                 return text.strip()
             else:
@@ -46,6 +139,205 @@ def listen(recognizer):
         return f"Microphone error: {str(e)}"
 
 # --- Voice output using macOS 'say' command ---
+# All speech goes through one long-lived worker thread, so the Streamlit script
+# thread is never blocked and utterances play in order without overlapping
+_TTS_QUEUE = queue.Queue()
+
+
+# Future of the utterance the TTS thread is playing right now, if any
+_RUNNING = None
+
+
+def _tts_loop():
+    """Run queued utterances one at a time"""
+    global _RUNNING
+    while True:
+        future, func, args = _TTS_QUEUE.get()
+        if not future.set_running_or_notify_cancel():
+            continue
+        _RUNNING = future
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            _RUNNING = None
+
+
+threading.Thread(target=_tts_loop, name="tts-worker", daemon=True).start()
+
+
+def _submit(func, *args):
+    """Queue an utterance for the TTS thread and return its Future"""
+    future = Future()
+    _TTS_QUEUE.put((future, func, args))
+    return future
+
+
+def _submit_for_session(func, *args):
+    """Queue an utterance and record it as this session's, so stop_speaking() only touches its own"""
+    future = _submit(func, *args)
+    pending = [f for f in st.session_state.get('tts_futures', ()) if not f.done()]
+    pending.append(future)
+    st.session_state.tts_futures = pending
+    st.session_state.tts_future = future
+    return future
+
+# Set by stop_speaking() so a streaming utterance stops between sentences
+_STOP_EVENT = threading.Event()
+
+# Longest text spoken for one response before pointing the user to the chat
+MAX_SPEECH_CHARS = 500
+
+# A sentence boundary: terminal punctuation followed by whitespace
+_SENTENCE_END_RE = re.compile(r'[.!?](?=\s)')
+# Everything up to the last terminal punctuation (the greedy prefix backtracks from the end)
+_LAST_SENTENCE_END_RE = re.compile(r'[\s\S]*[.!?]')
+
+
+# The 'say' process currently playing, so stop_speaking() can end just that one
+_SAY_PROC = None
+_SAY_LOCK = threading.Lock()
+
+
+def _say(speech_text):
+    """Run the 'say' command and wait for it (executes on the TTS thread)"""
+    global _SAY_PROC
+    with _SAY_LOCK:
+        proc = _SAY_PROC = subprocess.Popen(['say', speech_text])
+    try:
+        returncode = proc.wait()
+    finally:
+        with _SAY_LOCK:
+            if _SAY_PROC is proc:
+                _SAY_PROC = None
+    # A negative code means stop_speaking() terminated it, which is not a failure
+    if returncode > 0:
+        raise subprocess.CalledProcessError(returncode, ['say', speech_text])
+
+
+def _terminate_say():
+    """Terminate the 'say' process started by this app, if one is playing"""
+    with _SAY_LOCK:
+        if _SAY_PROC is not None and _SAY_PROC.poll() is None:
+            _SAY_PROC.terminate()
+
+
+# Markdown that needs a pattern, as one alternation so the text is scanned once:
+# code blocks, headers, links
+_MARKDOWN_RE = re.compile(
+    r'```[\s\S]*?```'
+    r'|#{1,6}\s+'
+    r'|\[([^\]]+)\]\([^)]+\)'
+)
+
+# Inline code, bold and italic markers are dropped character by character
+_MARKDOWN_CHARS = str.maketrans('', '', '`*')
+
+
+def _markdown_sub(match):
+    """Replacement for one _MARKDOWN_RE match: the inner text, or a placeholder for code blocks"""
+    if match.lastindex:
+        return match[match.lastindex]
+    return '[Code block]' if match[0].startswith('```') else ''
+
+
+def _clean_for_speech(text):
+    """Strip markdown formatting and code blocks for better speech"""
+    speech_text = _MARKDOWN_RE.sub(_markdown_sub, text).translate(_MARKDOWN_CHARS)
+    return speech_text.strip()
+
+
+def _speak_stream(deltas, min_chars=40):
+    """
+    Speak text from a queue one sentence at a time (executes on the TTS thread)
+
+    Args:
+        deltas: Queue of text deltas, terminated by None
+        min_chars: Minimum length of a spoken unit, so short fragments are merged
+    """
+    buffer = ""
+    spoken = 0
+    finished = False
+    while not finished:
+        delta = deltas.get()
+        if delta is None:
+            finished = True
+        else:
+            buffer += delta
+        
+        while not _STOP_EVENT.is_set():
+            # Speak up to the last sentence boundary, or everything once the stream ends
+            if finished:
+                end = len(buffer)
+            else:
+                match = None
+                for match in _SENTENCE_END_RE.finditer(buffer):
+                    pass
+                end = match.end() if match and match.end() >= min_chars else 0
+            # Code blocks are only replaced once they are closed
+            if not end or buffer[:end].count('```') % 2:
+                break
+            
+            sentence, buffer = _clean_for_speech(buffer[:end]), buffer[end:]
+            if sentence:
+                if spoken + len(sentence) > MAX_SPEECH_CHARS:
+                    _say("Response continues in chat")
+                    _STOP_EVENT.set()
+                    break
+                _say(sentence)
+                spoken += len(sentence)
+            if finished:
+                break
+
+
+def start_speech_stream():
+    """
+    Start speaking a response while it is still being generated
+
+    Returns:
+        Queue to put text deltas on (put None when the response is complete),
+        or None if voice output is unavailable
+    """
+    if not (st.session_state.voice_output_enabled and st.session_state.tts_working):
+        return None
+    
+    _STOP_EVENT.clear()
+    deltas = queue.Queue()
+    try:
+        _submit_for_session(_speak_stream, deltas)
+        st.toast("🔊 Speaking AI response...")
+    except Exception as e:
+        st.error(f"Voice output error: {e}")
+        st.session_state.tts_working = False
+        return None
+    return deltas
+
+
+def is_speaking():
+    """Return True while a submitted utterance is still playing"""
+    future = st.session_state.get('tts_future')
+    return future is not None and not future.done()
+
+
+def check_tts_status():
+    """Report a failed background utterance and disable TTS if it errored"""
+    future = st.session_state.get('tts_future')
+    if future is None or not future.done():
+        return
+    st.session_state.tts_future = None
+    # Stopped utterances are finished, not failed
+    if future.cancelled():
+        return
+    error = future.exception()
+    if isinstance(error, subprocess.CalledProcessError):
+        st.error(f"TTS command failed: {error}")
+        st.session_state.tts_working = False
+    elif error is not None:
+        st.error(f"Voice output error: {error}")
+        st.session_state.tts_working = False
+
+
 def speak(text):
     if not st.session_state.voice_output_enabled:
         st.info("🔇 Voice output is disabled")
@@ -53,55 +345,46 @@ def speak(text):
     if not st.session_state.tts_working:
         st.warning("🔇 TTS system not working. Voice output disabled.")
         return
-    if st.session_state.is_speaking:
-        st.warning("🔁 Already speaking. Please wait.")
-        return
     
     # Clean and truncate text for speech
-    speech_text = text.strip()
+    speech_text = _clean_for_speech(text)
     
-    # Remove markdown formatting and code blocks for better speech
-    import re
-    speech_text = re.sub(r'```[\s\S]*?```', '[Code block]', speech_text)  # Replace code blocks
-    speech_text = re.sub(r'`([^`]+)`', r'\1', speech_text)  # Remove inline code
-    speech_text = re.sub(r'\*\*([^*]+)\*\*', r'\1', speech_text)  # Remove bold
-    speech_text = re.sub(r'\*([^*]+)\*', r'\1', speech_text)  # Remove italic
-    speech_text = re.sub(r'#{1,6}\s+', '', speech_text)  # Remove headers
-    speech_text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', speech_text)  # Remove links
+    # Nothing worth speaking, so don't start a 'say' process for it
+    if len(speech_text) < 2:
+        return
     
     # Truncate very long responses to avoid long speech
-    if len(speech_text) > 500:
-        # Find a good breaking point (end of sentence)
-        truncated = speech_text[:500]
-        last_period = truncated.rfind('.')
-        last_exclamation = truncated.rfind('!')
-        last_question = truncated.rfind('?')
-        
-        break_point = max(last_period, last_exclamation, last_question)
+    if len(speech_text) > MAX_SPEECH_CHARS:
+        # Find a good breaking point (end of sentence) in one backwards scan
+        match = _LAST_SENTENCE_END_RE.match(speech_text, 0, MAX_SPEECH_CHARS)
+        break_point = match.end() - 1 if match else -1
         if break_point > 300:  # Only break if we have a reasonable sentence ending
             speech_text = speech_text[:break_point + 1] + " [Response continues in chat]"
         else:
-            speech_text = speech_text[:500] + " [Response continues in chat]"
+            speech_text = speech_text[:MAX_SPEECH_CHARS] + " [Response continues in chat]"
     
     try:
-        st.session_state.is_speaking = True
+        _submit_for_session(_say, speech_text)
         st.toast("🔊 Speaking AI response...")
-        subprocess.run(['say', speech_text], check=True)
-        st.toast("✅ Voice output completed!")
-    except subprocess.CalledProcessError as e:
-        st.error(f"TTS command failed: {e}")
-        st.session_state.tts_working = False
     except Exception as e:
         st.error(f"Voice output error: {e}")
         st.session_state.tts_working = False
-    finally:
-        st.session_state.is_speaking = False
 
 # --- Stop speaking function for macOS ---
 def stop_speaking():
     try:
-        subprocess.run(['pkill', 'say'], check=False)
-        st.session_state.is_speaking = False
+        # The TTS thread is shared by every session, so only this session's
+        # utterances are dropped; the worker skips cancelled futures
+        own = st.session_state.get('tts_futures', [])
+        for future in own:
+            future.cancel()
+        # Stop streamed sentences and kill the one playing only if it is ours
+        running = _RUNNING
+        if running is not None and running in own:
+            _STOP_EVENT.set()
+            _terminate_say()
+        st.session_state.tts_futures = []
+        st.session_state.tts_future = None
         st.toast("🔇 Voice stopped!")
     except Exception as e:
-        st.error(f"Error stopping voice: {e}")
\ No newline at end of file
+        st.error(f"Error stopping voice: {e}")
@@ -0,0 +1,39 @@
+import functools
+import diskcache
+
+# On-disk cache shared by the web tools, capped at 1 GB with LRU eviction
+web_cache = diskcache.Cache(
+    ".cache/web",
+    size_limit=1 << 30,
+    eviction_policy="least-recently-used"
+)
+
+_MISSING = object()
+
+
+def cached(ttl: float, cache_if=None):
+    """
+    Cache a function's results on disk for `ttl` seconds
+
+    Args:
+        ttl: Time in seconds a result stays valid
+        cache_if: Optional predicate; results for which it returns False
+            (e.g. error messages) are returned but not stored
+
+    Returns:
+        Decorator keyed on the function name and its arguments
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            result = web_cache.get(key, default=_MISSING)
+            if result is not _MISSING:
+                return result
+
+            result = func(*args, **kwargs)
+            if cache_if is None or cache_if(result):
+                web_cache.set(key, result, expire=ttl)
+            return result
+        return wrapper
+    return decorator